@@ -0,0 +1,16 @@
+#!/bin/bash
+# Start the local mock LLM server (extra arguments are passed through, see --help)
+
+SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
+
+# Prevent Python from creating cache files
+export PYTHONDONTWRITEBYTECODE=1
+
+# Activate virtual environment
+source "$SCRIPT_DIR/venv/bin/activate"
+
+# Run the mock server
+python3 "$SCRIPT_DIR/src/mock_llm_server.py" "$@"
+
+# Deactivate virtual environment
+deactivate
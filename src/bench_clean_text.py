@@ -0,0 +1,200 @@
+import sys
+import os
+sys.dont_write_bytecode = True
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Checks clean_text() against the golden corpus and times it against the
+# original one-regex-per-rule cleaner on long (10 KB+) answers:
+#
+#   python src/bench_clean_text.py
+#   python src/bench_clean_text.py --write-golden   # rebuild the corpus from the original cleaner
+
+import argparse
+import json
+import random
+import re
+import time
+from config import AIRLINE_CSV, VISA_CSV
+from utils.csv_loader import load_testcases
+from utils.text_cleaner import clean_text
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN_PATH = os.path.join(PROJECT_ROOT, "data", "golden", "clean_text.jsonl")
+
+HAND_WRITTEN = [
+    "",
+    "plain answer with no markdown at all.",
+    "**Bold** and __also bold__ and *italic* and _italic_ text.",
+    "Here is the answer: you may bring **one** bag.",
+    "HERE IS, the answer",
+    "According to: the policy, pets travel in the hold.",
+    "Based on the provided inputs and contexts, Here is: According to the rules, yes.",
+    "Here is\nHere is the second line.",
+    "# Title\n## Subtitle\n\n- item one\n* item two\n• item three\n1. first\n2. second",
+    "  - indented item\n\t* tabbed item\n10. tenth",
+    "Code:\n```python\nprint('x')\n```\nand `inline` code.",
+    "Unclosed ``` fence and `stray backtick",
+    "a * b * c, 2*3 = 6, x** y, **unclosed bold",
+    "snake_case_name and __init__ and _private",
+    "Line one\n\n\n\nLine two\n \n \nLine three",
+    "lots    of\t\tspaces \t here",
+    "\"straight quotes\" and 'single quotes'",
+    "text , \"'\").replace( more text",
+    "   \n\n  surrounded by whitespace  \n\n  ",
+    "Visa – fees: €80 — **café** résumé 日本",
+]
+
+FUZZ_ALPHABET = list('*_#-•`.\n \t1aB:,"\'') + [
+    "**", "__", "```", "1. ", "\n\n\n", "Here is ", "According to: ",
+    "Based on the provided inputs and contexts, ", ', "\'").replace(',
+]
+
+
+def reference_clean_text(text):
+    """clean_text() as originally written, one re.sub per rule; the golden corpus is built from it."""
+    if not text or not isinstance(text, str):
+        return ""
+
+    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
+    text = re.sub(r'__([^_]+)__', r'\1', text)
+    text = re.sub(r'\*([^*\n]+)\*', r'\1', text)
+    text = re.sub(r'_([^_\n]+)_', r'\1', text)
+
+    text = re.sub(r'\s+\*\s+', ' ', text)
+    text = re.sub(r'\*\s+', '', text)
+    text = re.sub(r'\s+\*', '', text)
+
+    text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
+
+    text = re.sub(r'^[\s]*[-*•]\s+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^\d+\.\s+', '', text, flags=re.MULTILINE)
+
+    text = re.sub(r'```[\s\S]*?```', '', text)
+    text = re.sub(r'`([^`]+)`', r'\1', text)
+
+    text = re.sub(r'^Based on the provided inputs and contexts[,\s:]+', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'^Here is[,\s:]+', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'^According to[,\s:]+', '', text, flags=re.IGNORECASE)
+
+    text = re.sub(r'\n\s*\n+', '\n\n', text)
+    text = re.sub(r'[ \t]+', ' ', text)
+
+    text = text.replace('"', '"').replace('"', '"')
+    text = text.replace(', "\'").replace(', "'")
+
+    return text.strip()
+
+
+def _sentences():
+    sentences = []
+    for path in (AIRLINE_CSV, VISA_CSV):
+        for test_case in load_testcases(path):
+            sentences.extend(test_case[field] for field in ("question", "expected_valid") if test_case.get(field))
+    return sentences or ["Please check the airline's policy for details."]
+
+
+def long_answer(rng, sentences, size, markdown=True):
+    """An answer of at least `size` characters, built from test suite sentences."""
+    parts = ["Based on the provided inputs and contexts, here is what applies:\n\n" if markdown else ""]
+    length = len(parts[0])
+    item = 0
+    while length < size:
+        sentence = rng.choice(sentences)
+        if markdown:
+            item += 1
+            style = rng.randrange(8)
+            if style == 0:
+                sentence = f"## Section {item}\n\n{sentence}\n"
+            elif style == 1:
+                sentence = f"- **Note:** {sentence}"
+            elif style == 2:
+                sentence = f"{item}. {sentence} See `policy_{item}` for *details*."
+            elif style == 3:
+                sentence = f"• __{sentence}__\n"
+            elif style == 4:
+                sentence = f"```\n{sentence}\n```"
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return "\n".join(parts)
+
+
+def build_corpus(seed=23):
+    rng = random.Random(seed)
+    sentences = _sentences()
+    texts = list(HAND_WRITTEN)
+    texts.extend(
+        "".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(1, 40)))
+        for _ in range(400)
+    )
+    texts.extend(long_answer(rng, sentences, size, markdown) for size in (2000, 12000) for markdown in (True, False))
+    return [{"input": text, "expected": reference_clean_text(text)} for text in texts]
+
+
+def write_golden(path=GOLDEN_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cases = build_corpus()
+    with open(path, "w", encoding="utf-8") as f:
+        for case in cases:
+            f.write(json.dumps(case, ensure_ascii=False) + "\n")
+    print(f"Wrote {len(cases)} cases to {path}")
+
+
+def check_golden(path=GOLDEN_PATH):
+    """Return the number of golden cases whose clean_text() output differs."""
+    with open(path, encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    failures = 0
+    for number, case in enumerate(cases, 1):
+        actual = clean_text(case["input"])
+        if actual != case["expected"]:
+            failures += 1
+            if failures <= 5:
+                print(f"Case {number} differs:\n  input:    {case['input'][:80]!r}\n"
+                      f"  expected: {case['expected'][:80]!r}\n  actual:   {actual[:80]!r}")
+    print(f"Golden corpus: {len(cases) - failures}/{len(cases)} cases identical")
+    return failures
+
+
+def _time(fn, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def benchmark(count=200, size=10240, repeat=5):
+    rng = random.Random(7)
+    sentences = _sentences()
+    for markdown in (True, False):
+        texts = [long_answer(rng, sentences, size, markdown) for _ in range(count)]
+        for text in texts:
+            if clean_text(text) != reference_clean_text(text):
+                raise AssertionError("clean_text() output differs from the original cleaner")
+        original = _time(reference_clean_text, texts, repeat)
+        current = _time(clean_text, texts, repeat)
+        label = "markdown" if markdown else "plain"
+        print(f"{label:>8}: {count} x {size // 1024} KB answers  original {original * 1000:7.1f} ms  "
+              f"clean_text {current * 1000:7.1f} ms  ({original / current:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark clean_text()")
+    parser.add_argument("--write-golden", action="store_true", help="Rebuild the golden corpus from the original cleaner")
+    parser.add_argument("--count", type=int, default=200, help="Answers per benchmark run")
+    parser.add_argument("--size", type=int, default=10240, help="Minimum answer length in characters")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs (best one is reported)")
+    args = parser.parse_args()
+
+    if args.write_golden:
+        write_golden()
+        return
+    if check_golden():
+        sys.exit(1)
+    benchmark(args.count, args.size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import sys
+sys.dont_write_bytecode = True
+import asyncio
+import threading
+import aiohttp
+import config
+from bots import deadline
+from bots.http_pool import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+
+ASYNC_POOL_SIZE = getattr(config, "ASYNC_POOL_SIZE", 100)
+
+_lock = threading.Lock()
+_loop = None
+_sessions = {}
+
+
+def get_loop():
+    """Return the shared event loop, starting its background thread on first use."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, name="async-pool", daemon=True)
+            thread.start()
+        return _loop
+
+
+def get_session():
+    """
+    Return the aiohttp session for the running event loop.
+
+    Every coroutine on the same loop shares one session, and therefore one
+    connection pool of up to ASYNC_POOL_SIZE sockets.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=ASYNC_POOL_SIZE)
+        timeout = aiohttp.ClientTimeout(sock_connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT)
+        session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        _sessions[loop] = session
+    return session
+
+
+def client_timeout(timeout):
+    """aiohttp timeout for one request: (connect, read) plus whatever is left of the run."""
+    connect, read = timeout
+    return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read, total=deadline.remaining())
+
+
+def submit(coro):
+    """Schedule a coroutine on the shared loop and return a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run(coro):
+    """Run a coroutine on the shared loop and block until it finishes."""
+    return submit(coro).result()
+
+
+async def _bounded(semaphore, coro):
+    try:
+        async with semaphore:
+            return await coro
+    finally:
+        # Cancelled while still waiting for the semaphore: coro never started
+        coro.close()
+
+
+def submit_bounded(coros, limit):
+    """
+    Schedule coroutines on the shared loop with at most `limit` running at once.
+
+    Returns:
+        List of concurrent.futures.Future, in the same order as `coros`
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+    return [submit(_bounded(semaphore, coro)) for coro in coros]
+
+
+async def _close_session():
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+def close():
+    """Close the shared loop's HTTP session (call once at the end of a run)."""
+    if _loop is not None:
+        run(_close_session())
@@ -0,0 +1,109 @@
+import sys
+sys.dont_write_bytecode = True
+import json
+import os
+from bots.prompt_builder import build_prompt, PROMPT_FIELDS
+from utils.text_cleaner import clean_text
+
+# Endpoint named in each manifest line (OpenAI Batch API input format)
+BATCH_URL = "/v1/chat/completions"
+
+
+def custom_id(test_set, idx, provider_name):
+    """ID linking a manifest line and its batch result back to one test case."""
+    return f"{test_set}-{idx}-{provider_name}"
+
+
+def build_request(provider, test_set, idx, test_case):
+    """
+    Build one batch request line for a test case.
+
+    The prompt, model and parameters are exactly what the interactive
+    client for this provider would send.
+    """
+    full_prompt = build_prompt(test_set_type=test_set, **{field: test_case.get(field, "") for field in PROMPT_FIELDS})
+    body = {
+        "model": provider.model,
+        "messages": [{"role": "user", "content": full_prompt}]
+    }
+    body.update(provider.params)
+    return {
+        "custom_id": custom_id(test_set, idx, provider.name),
+        "method": "POST",
+        "url": BATCH_URL,
+        "body": body
+    }
+
+
+def write_manifest(path, requests):
+    """Write batch requests as JSONL; returns the number of lines written."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def _parse_result(record):
+    """Return (raw_answer, error_message) for one batch output line."""
+    error = record.get("error")
+    if error:
+        return None, error.get("message", str(error)) if isinstance(error, dict) else str(error)
+
+    response = record.get("response") or {}
+    body = response.get("body") or {}
+    status = response.get("status_code", 200)
+    if status != 200 or "error" in body:
+        error_body = body.get("error") or {}
+        message = error_body.get("message", str(error_body)) if isinstance(error_body, dict) else str(error_body)
+        return None, f"HTTP {status}: {message}"
+
+    if not body.get("choices"):
+        return None, "No choices in response"
+    return body["choices"][0]["message"]["content"].strip(), None
+
+
+def read_results(paths):
+    """
+    Read completed batch output files (OpenAI Batch API output format).
+
+    Args:
+        paths: Local JSONL files; results for the same custom_id in later
+            files replace earlier ones, so retried batches can be appended
+
+    Returns:
+        Dictionary of custom_id -> (raw_answer, error_message); exactly one
+        of the two is None
+    """
+    results = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON ({str(e)})")
+                if "custom_id" not in record:
+                    raise ValueError(f"{path}:{line_number}: missing custom_id")
+                results[record["custom_id"]] = _parse_result(record)
+    return results
+
+
+def has_answer(results, test_set, idx, provider):
+    """True if the batch returned an answer, not an error, for this test case."""
+    return results.get(custom_id(test_set, idx, provider.name), (None, "No batch result"))[1] is None
+
+
+def answer_for(results, test_set, idx, provider, clean=True):
+    """Cleaned (or, with clean=False, raw) answer for one test case, or the provider's error string."""
+    raw_answer, error = results.get(custom_id(test_set, idx, provider.name), (None, "No batch result"))
+    if error is not None:
+        return f"[{provider.label} Error] {error}"
+    return clean_text(raw_answer) if clean else raw_answer
@@ -1,45 +1,246 @@
 import sys
 sys.dont_write_bytecode = True
+import os
+import time
 import openai
+import config
 from config import OPENAI_API_KEY
-from utils.text_cleaner import clean_text
+from bots import async_pool, deadline, http_pool, rate_limiter, resilience, response_cache
+from bots.prompt_builder import build_prompt
+from utils.text_cleaner import IncrementalCleaner, clean_text
 
-openai.api_key = OPENAI_API_KEY
+# http_pool session every provider on this client shares; the openai
+# library keeps one session per thread, so it cannot be split per provider
+HTTP_SESSION = "openai"
 
-def ask_chatgpt(question: str, input_1: str = "", input_2: str = "", input_3: str = "", 
+# Share one keep-alive session across threads instead of openai's per-thread default
+openai.requestssession = http_pool.get_session(HTTP_SESSION)
+
+CHATGPT_MODEL = "gpt-3.5-turbo"
+
+# e.g. http://127.0.0.1:8000/v1 for the local mock server; the environment wins over config
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or getattr(config, "OPENAI_BASE_URL", None)
+if OPENAI_BASE_URL:
+    openai.api_base = OPENAI_BASE_URL
+
+
+def resolve_endpoint(url=None):
+    """API base a request goes to: the provider's url, else the openai library's."""
+    return url or openai.api_base
+
+
+def resolve_api_key(url=None, api_key=None):
+    """
+    Key to send with a request. OPENAI_API_KEY only goes to the default
+    endpoint; a provider with its own url must bring its own key.
+    """
+    if api_key:
+        return api_key
+    if url:
+        raise ValueError(f"No api_key for {url}; OPENAI_API_KEY is only sent to the default endpoint")
+    return OPENAI_API_KEY
+
+
+def _as_throttled(e):
+    """Map an openai 429 to ThrottledError; an exhausted quota is not retryable."""
+    if getattr(e, "code", None) == "insufficient_quota":
+        return e
+    retry_after = rate_limiter.parse_retry_after((e.headers or {}).get("retry-after"))
+    return rate_limiter.ThrottledError(str(e), retry_after=retry_after)
+
+
+def _record_usage(name, response, tokens):
+    usage = response.get("usage") or {}
+    rate_limiter.get_limiter(name).record_usage(tokens, usage.get("total_tokens"))
+
+
+def ask_chatgpt(question: str, input_1: str = "", input_2: str = "", input_3: str = "",
                 context_1: str = "", context_2: str = "", context_3: str = "",
-                test_set_type: str = "") -> str:
-    prompt_parts = []
-    
-    if test_set_type == "airline_policy":
-        prompt_parts.append("IMPORTANT: All questions are specifically about Emirates Airlines policies, services, and regulations. Please answer with Emirates Airlines-specific information only.")
-    elif test_set_type == "visa_guidance":
-        prompt_parts.append("IMPORTANT: All questions are specifically about UAE (United Arab Emirates) visa requirements, regulations, and policies. Please answer with UAE-specific information only.")
-    
-    prompt_parts.append(f"Question: {question}")
-    
-    if input_1:
-        prompt_parts.append(f"Input 1: {input_1}")
-    if input_2:
-        prompt_parts.append(f"Input 2: {input_2}")
-    if input_3:
-        prompt_parts.append(f"Input 3: {input_3}")
-    if context_1:
-        prompt_parts.append(f"Context 1: {context_1}")
-    if context_2:
-        prompt_parts.append(f"Context 2: {context_2}")
-    if context_3:
-        prompt_parts.append(f"Context 3: {context_3}")
-    
-    prompt_parts.append("\nPlease provide a comprehensive answer based on the above information.")
-    full_prompt = "\n".join(prompt_parts)
-    
+                test_set_type: str = "", name: str = "chatgpt", label: str = "ChatGPT",
+                model: str = CHATGPT_MODEL, params: dict = None, url: str = None,
+                api_key: str = None, clean: bool = True) -> str:
+    """
+    Ask an OpenAI chat model one test case.
+
+    name, label, model, params (extra request fields such as temperature),
+    url (API base) and api_key let the provider registry point this client
+    at any model served through the openai library. With clean=False the
+    answer is returned as the model wrote it, without clean_text().
+    """
+    full_prompt = build_prompt(
+        question=question, input_1=input_1, input_2=input_2, input_3=input_3,
+        context_1=context_1, context_2=context_2, context_3=context_3,
+        test_set_type=test_set_type
+    )
+
+    api_key = resolve_api_key(url, api_key)
+    url = resolve_endpoint(url)
+    cached = response_cache.get(name, model, full_prompt, params, url)
+    if cached is not None:
+        return clean_text(cached) if clean else cached
+
+    tokens = rate_limiter.estimate_tokens(full_prompt)
+
+    def send():
+        try:
+            return openai.ChatCompletion.create(
+                model=model,
+                messages=[{"role": "user", "content": full_prompt}],
+                api_key=api_key,
+                api_base=url,
+                request_timeout=deadline.clamp_timeout(http_pool.get_timeout(name)),
+                **(params or {})
+            )
+        except openai.error.RateLimitError as e:
+            raise _as_throttled(e)
+
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": full_prompt}]
-        )
+        response = resilience.call(name, lambda: rate_limiter.call(name, send, tokens))
+        _record_usage(name, response, tokens)
+        raw_response = response["choices"][0]["message"]["content"].strip()
+        response_cache.put(name, model, full_prompt, raw_response, params, url)
+        return clean_text(raw_response) if clean else raw_response
+    except deadline.DeadlineExceeded:
+        # The caller skips the case rather than recording an error answer
+        raise
+    except Exception as e:
+        return f"[{label} Error] {str(e)}"
+
+
+async def ask_chatgpt_async(question: str, input_1: str = "", input_2: str = "", input_3: str = "",
+                            context_1: str = "", context_2: str = "", context_3: str = "",
+                            test_set_type: str = "", name: str = "chatgpt", label: str = "ChatGPT",
+                            model: str = CHATGPT_MODEL, params: dict = None, url: str = None,
+                            api_key: str = None, clean: bool = True) -> str:
+    """Async version of ask_chatgpt using the shared aiohttp session."""
+    full_prompt = build_prompt(
+        question=question, input_1=input_1, input_2=input_2, input_3=input_3,
+        context_1=context_1, context_2=context_2, context_3=context_3,
+        test_set_type=test_set_type
+    )
+
+    api_key = resolve_api_key(url, api_key)
+    url = resolve_endpoint(url)
+    cached = response_cache.get(name, model, full_prompt, params, url)
+    if cached is not None:
+        return clean_text(cached) if clean else cached
+
+    tokens = rate_limiter.estimate_tokens(full_prompt)
+
+    async def send():
+        try:
+            return await openai.ChatCompletion.acreate(
+                model=model,
+                messages=[{"role": "user", "content": full_prompt}],
+                api_key=api_key,
+                api_base=url,
+                request_timeout=deadline.clamp_timeout(http_pool.get_timeout(name)),
+                **(params or {})
+            )
+        except openai.error.RateLimitError as e:
+            raise _as_throttled(e)
+
+    try:
+        # aiosession is a context variable, so this only affects the current task
+        openai.aiosession.set(async_pool.get_session())
+        response = await resilience.call_async(name, lambda: rate_limiter.call_async(name, send, tokens))
+        _record_usage(name, response, tokens)
         raw_response = response["choices"][0]["message"]["content"].strip()
-        return clean_text(raw_response)
+        response_cache.put(name, model, full_prompt, raw_response, params, url)
+        return clean_text(raw_response) if clean else raw_response
+    except deadline.DeadlineExceeded:
+        # The caller skips the case rather than recording an error answer
+        raise
+    except Exception as e:
+        return f"[{label} Error] {str(e)}"
+
+
+def ask_chatgpt_stream(question: str, input_1: str = "", input_2: str = "", input_3: str = "",
+                       context_1: str = "", context_2: str = "", context_3: str = "",
+                       test_set_type: str = "", name: str = "chatgpt", label: str = "ChatGPT",
+                       model: str = CHATGPT_MODEL, params: dict = None, url: str = None,
+                       api_key: str = None, stop_check=None) -> dict:
+    """
+    Streaming version of ask_chatgpt that records time-to-first-token.
+
+    stop_check, if given, has reset() and feed(chunk) -> bool; generation is
+    abandoned as soon as feed() returns True.
+
+    Returns:
+        Dictionary with answer, ttft and total_time (seconds; None if not
+        measured) and stopped_early
+    """
+    full_prompt = build_prompt(
+        question=question, input_1=input_1, input_2=input_2, input_3=input_3,
+        context_1=context_1, context_2=context_2, context_3=context_3,
+        test_set_type=test_set_type
+    )
+    result = {"answer": "", "ttft": None, "total_time": None, "stopped_early": False}
+
+    api_key = resolve_api_key(url, api_key)
+    url = resolve_endpoint(url)
+    cached = response_cache.get(name, model, full_prompt, params, url)
+    if cached is not None:
+        result["answer"] = clean_text(cached)
+        return result
+
+    tokens = rate_limiter.estimate_tokens(full_prompt)
+
+    def send():
+        started = time.perf_counter()
+        ttft = None
+        parts = []
+        # Cleaned while the answer streams in, rather than all at the end
+        cleaner = IncrementalCleaner(strip_input=True)
+        cleaned = []
+        stopped_early = False
+        if stop_check is not None:
+            stop_check.reset()
+        # Provider params may carry their own "stream"; this call always streams
+        options = dict(params or {})
+        options["stream"] = True
+        try:
+            stream = openai.ChatCompletion.create(
+                model=model,
+                messages=[{"role": "user", "content": full_prompt}],
+                api_key=api_key,
+                api_base=url,
+                request_timeout=deadline.clamp_timeout(http_pool.get_timeout(name)),
+                **options
+            )
+        except openai.error.RateLimitError as e:
+            raise _as_throttled(e)
+        try:
+            for chunk in stream:
+                deadline.check()
+                if not chunk["choices"]:
+                    continue
+                content = chunk["choices"][0]["delta"].get("content")
+                if not content:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                parts.append(content)
+                cleaned.append(cleaner.feed(content))
+                if stop_check is not None and stop_check.feed(content):
+                    stopped_early = True
+                    break
+        finally:
+            stream.close()
+        cleaned.append(cleaner.finish())
+        return "".join(parts), "".join(cleaned), ttft, time.perf_counter() - started, stopped_early
+
+    try:
+        raw_response, answer, ttft, total_time, stopped_early = resilience.call(
+            name, lambda: rate_limiter.call(name, send, tokens)
+        )
+        raw_response = raw_response.strip()
+        if not stopped_early:
+            response_cache.put(name, model, full_prompt, raw_response, params, url)
+        result.update(answer=answer, ttft=ttft, total_time=total_time, stopped_early=stopped_early)
+    except deadline.DeadlineExceeded:
+        # The caller skips the case rather than recording an error answer
+        raise
     except Exception as e:
-        return f"[ChatGPT Error] {str(e)}"
+        result["answer"] = f"[{label} Error] {str(e)}"
+    return result
@@ -0,0 +1,63 @@
+import sys
+sys.dont_write_bytecode = True
+import time
+import config
+
+RUN_DEADLINE = getattr(config, "RUN_DEADLINE", None)
+
+# Never hand a socket less than this, so a nearly spent budget fails fast instead of raising ValueError
+_MIN_TIMEOUT = 0.01
+
+_deadline = None
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting work once the run's time budget is spent."""
+
+
+def start(seconds):
+    """Give the current run `seconds` of wall-clock time (None removes the limit)."""
+    global _deadline
+    _deadline = time.monotonic() + seconds if seconds is not None else None
+
+
+def clear():
+    start(None)
+
+
+def remaining():
+    """Seconds left in the run, or None if there is no deadline."""
+    if _deadline is None:
+        return None
+    return max(0.0, _deadline - time.monotonic())
+
+
+def expired():
+    return _deadline is not None and time.monotonic() >= _deadline
+
+
+def check():
+    """Raise DeadlineExceeded if the run's time budget is spent."""
+    if expired():
+        raise DeadlineExceeded("Run deadline reached; call not started")
+
+
+def clamp_timeout(timeout):
+    """
+    Shorten a (connect, read) timeout so the call cannot outlive the run.
+
+    Raises:
+        DeadlineExceeded: If no time is left at all
+    """
+    check()
+    left = remaining()
+    if left is None:
+        return timeout
+    connect, read = timeout
+    return (max(_MIN_TIMEOUT, min(connect, left)), max(_MIN_TIMEOUT, min(read, left)))
+
+
+def clamp_delay(delay):
+    """Shorten a backoff or rate-limit wait to the time left in the run."""
+    left = remaining()
+    return delay if left is None else min(delay, left)
@@ -1,70 +1,303 @@
 import sys
 sys.dont_write_bytecode = True
+import json
+import os
+import time
 import requests
+import config
 from config import DEEPSEEK_API_KEY
-from utils.text_cleaner import clean_text
+from bots import async_pool, deadline, http_pool, rate_limiter, resilience, response_cache
+from bots.prompt_builder import build_prompt
+from utils.text_cleaner import IncrementalCleaner, clean_text
 
-DEEPSEEK_URL = "https://api.deepseek.com/chat/completions"
+# e.g. http://127.0.0.1:8000 for the local mock server; the environment wins over config
+DEEPSEEK_BASE_URL = (os.environ.get("DEEPSEEK_BASE_URL") or getattr(config, "DEEPSEEK_BASE_URL", None)
+                     or "https://api.deepseek.com")
+DEEPSEEK_URL = DEEPSEEK_BASE_URL.rstrip("/") + "/chat/completions"
+DEEPSEEK_MODEL = "deepseek-chat"
 
-def ask_deepseek(question: str, input_1: str = "", input_2: str = "", input_3: str = "",
-                 context_1: str = "", context_2: str = "", context_3: str = "",
-                 test_set_type: str = "") -> str:
-    prompt_parts = []
-    
-    if test_set_type == "airline_policy":
-        prompt_parts.append("IMPORTANT: All questions are specifically about Emirates Airlines policies, services, and regulations. Please answer with Emirates Airlines-specific information only.")
-    elif test_set_type == "visa_guidance":
-        prompt_parts.append("IMPORTANT: All questions are specifically about UAE (United Arab Emirates) visa requirements, regulations, and policies. Please answer with UAE-specific information only.")
-    
-    prompt_parts.append(f"Question: {question}")
-    
-    if input_1:
-        prompt_parts.append(f"Input 1: {input_1}")
-    if input_2:
-        prompt_parts.append(f"Input 2: {input_2}")
-    if input_3:
-        prompt_parts.append(f"Input 3: {input_3}")
-    if context_1:
-        prompt_parts.append(f"Context 1: {context_1}")
-    if context_2:
-        prompt_parts.append(f"Context 2: {context_2}")
-    if context_3:
-        prompt_parts.append(f"Context 3: {context_3}")
-    
-    prompt_parts.append("\nPlease provide a comprehensive answer based on the above information.")
-    full_prompt = "\n".join(prompt_parts)
-    
+
+def resolve_endpoint(url=None):
+    """Chat completions URL a request goes to: the provider's url, else DeepSeek's."""
+    return url or DEEPSEEK_URL
+
+
+def resolve_api_key(url=None, api_key=None):
+    """
+    Key to send with a request. DEEPSEEK_API_KEY only goes to the default
+    endpoint; a provider with its own url must bring its own key.
+    """
+    if api_key:
+        return api_key
+    if url:
+        raise ValueError(f"No api_key for {url}; DEEPSEEK_API_KEY is only sent to the default endpoint")
+    return DEEPSEEK_API_KEY
+
+
+def _build_request(full_prompt, model, params, api_key):
     headers = {
         "Content-Type": "application/json",
-        "Authorization": f"Bearer {DEEPSEEK_API_KEY}"
+        "Authorization": f"Bearer {api_key}"
     }
 
     payload = {
-        "model": "deepseek-chat",
+        "model": model,
         "messages": [{"role": "user", "content": full_prompt}]
     }
+    payload.update(params or {})
+    return headers, payload
 
-    try:
-        response = requests.post(DEEPSEEK_URL, headers=headers, json=payload)
+
+class ProviderError(Exception):
+    """An error answer from the API that is not worth retrying (e.g. HTTP 401)."""
+
+
+def _throttled(status, error_msg, headers):
+    retry_after = rate_limiter.parse_retry_after(headers.get("Retry-After"))
+    return rate_limiter.ThrottledError(f"HTTP {status}: {error_msg}", retry_after=retry_after)
+
+
+def _record_usage(name, data, tokens):
+    usage = data.get("usage") or {}
+    rate_limiter.get_limiter(name).record_usage(tokens, usage.get("total_tokens"))
+
+
+def _parse_response(data, full_prompt, name, label, model, params, url, clean=True):
+    if "error" in data:
+        error_msg = data["error"].get("message", str(data["error"]))
+        return f"[{label} Error] {error_msg}"
+
+    if "choices" not in data or not data["choices"]:
+        return f"[{label} Error] No choices in response"
+
+    raw_response = data["choices"][0]["message"]["content"].strip()
+    response_cache.put(name, model, full_prompt, raw_response, params, url)
+    return clean_text(raw_response) if clean else raw_response
+
+
+def ask_deepseek(question: str, input_1: str = "", input_2: str = "", input_3: str = "",
+                 context_1: str = "", context_2: str = "", context_3: str = "",
+                 test_set_type: str = "", name: str = "deepseek", label: str = "DeepSeek",
+                 model: str = DEEPSEEK_MODEL, params: dict = None, url: str = None,
+                 api_key: str = None, clean: bool = True) -> str:
+    """
+    Ask DeepSeek one test case over its OpenAI-compatible HTTP API.
+
+    name, label, model, params (extra payload fields such as temperature),
+    url and api_key let the provider registry point this client at any
+    OpenAI-compatible chat completions endpoint. With clean=False the
+    answer is returned as the model wrote it, without clean_text().
+    """
+    full_prompt = build_prompt(
+        question=question, input_1=input_1, input_2=input_2, input_3=input_3,
+        context_1=context_1, context_2=context_2, context_3=context_3,
+        test_set_type=test_set_type
+    )
+    api_key = resolve_api_key(url, api_key)
+    url = resolve_endpoint(url)
+    cached = response_cache.get(name, model, full_prompt, params, url)
+    if cached is not None:
+        return clean_text(cached) if clean else cached
+
+    headers, payload = _build_request(full_prompt, model, params, api_key)
+    tokens = rate_limiter.estimate_tokens(full_prompt)
+    session = http_pool.get_session(name)
+
+    def send():
+        response = session.post(url, headers=headers, json=payload, timeout=deadline.clamp_timeout(http_pool.get_timeout(name)))
+        if response.status_code == 429:
+            try:
+                error_msg = response.json().get("error", {}).get("message", response.reason)
+            except:
+                error_msg = response.reason
+            raise _throttled(response.status_code, error_msg, response.headers)
         response.raise_for_status()
-        data = response.json()
-        
-        if "error" in data:
-            error_msg = data["error"].get("message", str(data["error"]))
-            return f"[DeepSeek Error] {error_msg}"
-        
-        if "choices" not in data or not data["choices"]:
-            return f"[DeepSeek Error] No choices in response"
-        
-        raw_response = data["choices"][0]["message"]["content"].strip()
-        return clean_text(raw_response)
+        return response.json()
+
+    try:
+        data = resilience.call(name, lambda: rate_limiter.call(name, send, tokens))
+        _record_usage(name, data, tokens)
+        return _parse_response(data, full_prompt, name, label, model, params, url, clean)
+
+    except deadline.DeadlineExceeded:
+        # The caller skips the case rather than recording an error answer
+        raise
+    except rate_limiter.ThrottledError as e:
+        return f"[{label} Error] {str(e)}"
+    except requests.exceptions.HTTPError as e:
+        try:
+            error_data = e.response.json()
+            error_msg = error_data.get("error", {}).get("message", str(e))
+            return f"[{label} Error] HTTP {e.response.status_code}: {error_msg}"
+        except:
+            return f"[{label} Error] HTTP {e.response.status_code}: {str(e)}"
+    except Exception as e:
+        return f"[{label} Error] {str(e)}"
+
+
+async def ask_deepseek_async(question: str, input_1: str = "", input_2: str = "", input_3: str = "",
+                             context_1: str = "", context_2: str = "", context_3: str = "",
+                             test_set_type: str = "", name: str = "deepseek", label: str = "DeepSeek",
+                             model: str = DEEPSEEK_MODEL, params: dict = None, url: str = None,
+                             api_key: str = None, clean: bool = True) -> str:
+    """Async version of ask_deepseek using the shared aiohttp session."""
+    full_prompt = build_prompt(
+        question=question, input_1=input_1, input_2=input_2, input_3=input_3,
+        context_1=context_1, context_2=context_2, context_3=context_3,
+        test_set_type=test_set_type
+    )
+    api_key = resolve_api_key(url, api_key)
+    url = resolve_endpoint(url)
+    cached = response_cache.get(name, model, full_prompt, params, url)
+    if cached is not None:
+        return clean_text(cached) if clean else cached
+
+    headers, payload = _build_request(full_prompt, model, params, api_key)
+    tokens = rate_limiter.estimate_tokens(full_prompt)
+    session = async_pool.get_session()
+
+    async def send():
+        timeout = async_pool.client_timeout(deadline.clamp_timeout(http_pool.get_timeout(name)))
+        async with session.post(url, headers=headers, json=payload, timeout=timeout) as response:
+            if response.status >= 400:
+                try:
+                    error_data = await response.json(content_type=None)
+                    error_msg = error_data.get("error", {}).get("message", response.reason)
+                except:
+                    error_msg = response.reason
+                if response.status == 429:
+                    raise _throttled(response.status, error_msg, response.headers)
+                if response.status in resilience.RETRYABLE_STATUSES:
+                    raise resilience.RetryableError(f"HTTP {response.status}: {error_msg}")
+                # Raised, like the sync client's HTTPError, so the rate limiter and
+                # circuit breaker count it as a failure
+                raise ProviderError(f"HTTP {response.status}: {error_msg}")
+            return await response.json(content_type=None)
+
+    try:
+        data = await resilience.call_async(name, lambda: rate_limiter.call_async(name, send, tokens))
+        _record_usage(name, data, tokens)
+        return _parse_response(data, full_prompt, name, label, model, params, url, clean)
+
+    except deadline.DeadlineExceeded:
+        # The caller skips the case rather than recording an error answer
+        raise
+    except Exception as e:
+        return f"[{label} Error] {str(e)}"
+
+
+def ask_deepseek_stream(question: str, input_1: str = "", input_2: str = "", input_3: str = "",
+                        context_1: str = "", context_2: str = "", context_3: str = "",
+                        test_set_type: str = "", name: str = "deepseek", label: str = "DeepSeek",
+                        model: str = DEEPSEEK_MODEL, params: dict = None, url: str = None,
+                        api_key: str = None, stop_check=None) -> dict:
+    """
+    Streaming (SSE) version of ask_deepseek that records time-to-first-token.
+
+    stop_check, if given, has reset() and feed(chunk) -> bool; the stream is
+    closed, which stops generation, as soon as feed() returns True.
+
+    Returns:
+        Dictionary with answer, ttft and total_time (seconds; None if not
+        measured) and stopped_early
+    """
+    full_prompt = build_prompt(
+        question=question, input_1=input_1, input_2=input_2, input_3=input_3,
+        context_1=context_1, context_2=context_2, context_3=context_3,
+        test_set_type=test_set_type
+    )
+    result = {"answer": "", "ttft": None, "total_time": None, "stopped_early": False}
+
+    api_key = resolve_api_key(url, api_key)
+    url = resolve_endpoint(url)
+    cached = response_cache.get(name, model, full_prompt, params, url)
+    if cached is not None:
+        result["answer"] = clean_text(cached)
+        return result
+
+    headers, payload = _build_request(full_prompt, model, params, api_key)
+    payload["stream"] = True
+    tokens = rate_limiter.estimate_tokens(full_prompt)
+    session = http_pool.get_session(name)
+
+    def send():
+        started = time.perf_counter()
+        ttft = None
+        parts = []
+        # Cleaned while the answer streams in, rather than all at the end
+        cleaner = IncrementalCleaner(strip_input=True)
+        cleaned = []
+        stopped_early = False
+        if stop_check is not None:
+            stop_check.reset()
+        response = session.post(url, headers=headers, json=payload,
+                                 timeout=deadline.clamp_timeout(http_pool.get_timeout(name)), stream=True)
+        try:
+            if response.status_code == 429:
+                try:
+                    error_msg = response.json().get("error", {}).get("message", response.reason)
+                except:
+                    error_msg = response.reason
+                raise _throttled(response.status_code, error_msg, response.headers)
+            if response.status_code >= 400:
+                # Load the error body now; the stream is closed before the caller reads it
+                response.content
+                response.raise_for_status()
+
+            for line in response.iter_lines(decode_unicode=True):
+                deadline.check()
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if "error" in event:
+                    error = event["error"]
+                    raise ProviderError(error.get("message", str(error)) if isinstance(error, dict) else str(error))
+                if not event.get("choices"):
+                    continue
+                content = event["choices"][0].get("delta", {}).get("content")
+                if not content:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                parts.append(content)
+                cleaned.append(cleaner.feed(content))
+                if stop_check is not None and stop_check.feed(content):
+                    stopped_early = True
+                    break
+        finally:
+            response.close()
+
+        cleaned.append(cleaner.finish())
+        data = {"choices": [{"message": {"content": "".join(parts)}}]}
+        return data, "".join(cleaned), ttft, time.perf_counter() - started, stopped_early
+
+    try:
+        data, cleaned, ttft, total_time, stopped_early = resilience.call(
+            name, lambda: rate_limiter.call(name, send, tokens)
+        )
+        if stopped_early:
+            answer = cleaned
+        else:
+            # Caches the raw answer; it was already cleaned as it streamed in
+            _parse_response(data, full_prompt, name, label, model, params, url, clean=False)
+            answer = cleaned
+        result.update(answer=answer, ttft=ttft, total_time=total_time, stopped_early=stopped_early)
 
+    except deadline.DeadlineExceeded:
+        # The caller skips the case rather than recording an error answer
+        raise
+    except rate_limiter.ThrottledError as e:
+        result["answer"] = f"[{label} Error] {str(e)}"
     except requests.exceptions.HTTPError as e:
         try:
             error_data = e.response.json()
             error_msg = error_data.get("error", {}).get("message", str(e))
-            return f"[DeepSeek Error] HTTP {e.response.status_code}: {error_msg}"
+            result["answer"] = f"[{label} Error] HTTP {e.response.status_code}: {error_msg}"
         except:
-            return f"[DeepSeek Error] HTTP {e.response.status_code}: {str(e)}"
+            result["answer"] = f"[{label} Error] HTTP {e.response.status_code}: {str(e)}"
     except Exception as e:
-        return f"[DeepSeek Error] {str(e)}"
+        result["answer"] = f"[{label} Error] {str(e)}"
+    return result
@@ -0,0 +1,136 @@
+import sys
+sys.dont_write_bytecode = True
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import config
+from bots import deadline, registry
+
+PARALLEL_PROVIDERS = getattr(config, "PARALLEL_PROVIDERS", True)
+
+
+def _prompt_kwargs(question, input_1, input_2, input_3, context_1, context_2, context_3, test_set_type):
+    return {
+        "question": question, "input_1": input_1, "input_2": input_2, "input_3": input_3,
+        "context_1": context_1, "context_2": context_2, "context_3": context_3,
+        "test_set_type": test_set_type
+    }
+
+
+def _ask_safely(ask_fn, label, prompt_kwargs, **options):
+    """Call a provider client, turning any exception (but a passed deadline) into its error string."""
+    try:
+        return ask_fn(**prompt_kwargs, **options)
+    except deadline.DeadlineExceeded:
+        raise
+    except Exception as e:
+        return f"[{label} Error] {str(e)}"
+
+
+def ask_all(providers, question: str, input_1: str = "", input_2: str = "", input_3: str = "",
+            context_1: str = "", context_2: str = "", context_3: str = "",
+            test_set_type: str = "", parallel: bool = PARALLEL_PROVIDERS, clean: bool = True):
+    """
+    Ask every provider the same test case.
+
+    With parallel=True all requests are in flight at once, so the case costs
+    the slowest provider's latency instead of the sum of all of them.
+    clean=False leaves cleaning the answers to the caller; error strings
+    can be told apart with Provider.is_error().
+
+    Raises:
+        DeadlineExceeded: If the run deadline passed before a call could
+            finish; the case is skipped instead of recording error answers
+
+    Returns:
+        Dictionary of provider name -> answer, in the order of `providers`
+    """
+    prompt_kwargs = _prompt_kwargs(question, input_1, input_2, input_3,
+                                   context_1, context_2, context_3, test_set_type)
+
+    if not parallel or len(providers) < 2:
+        return {p.name: _ask_safely(p.ask, p.label, prompt_kwargs, clean=clean) for p in providers}
+
+    with ThreadPoolExecutor(max_workers=len(providers)) as pool:
+        futures = {p.name: pool.submit(_ask_safely, p.ask, p.label, prompt_kwargs, clean=clean) for p in providers}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def ask_both(question: str, input_1: str = "", input_2: str = "", input_3: str = "",
+             context_1: str = "", context_2: str = "", context_3: str = "",
+             test_set_type: str = "", parallel: bool = PARALLEL_PROVIDERS):
+    """
+    Ask ChatGPT and DeepSeek the same test case.
+
+    Returns:
+        Tuple of (chatgpt_answer, deepseek_answer)
+    """
+    answers = ask_all(
+        registry.get_providers(["chatgpt", "deepseek"]),
+        question=question, input_1=input_1, input_2=input_2, input_3=input_3,
+        context_1=context_1, context_2=context_2, context_3=context_3,
+        test_set_type=test_set_type, parallel=parallel
+    )
+    return answers["chatgpt"], answers["deepseek"]
+
+
+def _stream_safely(provider, prompt_kwargs, stop_check):
+    try:
+        return provider.ask_stream(stop_check=stop_check, **prompt_kwargs)
+    except deadline.DeadlineExceeded:
+        raise
+    except Exception as e:
+        return {"answer": f"[{provider.label} Error] {str(e)}", "ttft": None, "total_time": None, "stopped_early": False}
+
+
+def ask_all_stream(providers, question: str, input_1: str = "", input_2: str = "", input_3: str = "",
+                   context_1: str = "", context_2: str = "", context_3: str = "",
+                   test_set_type: str = "", make_stop_check=None):
+    """
+    Streaming version of ask_all; every stream runs at the same time.
+
+    make_stop_check, if given, is called once per provider to build the stop
+    check (see judge.llm_judge.StreamingCoverage) that ends its stream early.
+
+    Returns:
+        Dictionary of provider name -> dict with answer, ttft, total_time and
+        stopped_early
+    """
+    prompt_kwargs = _prompt_kwargs(question, input_1, input_2, input_3,
+                                   context_1, context_2, context_3, test_set_type)
+    with ThreadPoolExecutor(max_workers=max(1, len(providers))) as pool:
+        futures = {
+            p.name: pool.submit(_stream_safely, p, prompt_kwargs, make_stop_check() if make_stop_check else None)
+            for p in providers
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+async def _ask_safely_async(ask_fn, label, prompt_kwargs):
+    try:
+        return await ask_fn(**prompt_kwargs)
+    except deadline.DeadlineExceeded:
+        raise
+    except Exception as e:
+        return f"[{label} Error] {str(e)}"
+
+
+async def ask_all_async(providers, question: str, input_1: str = "", input_2: str = "", input_3: str = "",
+                        context_1: str = "", context_2: str = "", context_3: str = "",
+                        test_set_type: str = ""):
+    """
+    Async version of ask_all; all requests share the event loop's HTTP pool.
+
+    Raises:
+        DeadlineExceeded: If the run deadline passed before the case could
+            start (or before one of its calls could)
+
+    Returns:
+        Dictionary of provider name -> answer, in the order of `providers`
+    """
+    deadline.check()
+    prompt_kwargs = _prompt_kwargs(question, input_1, input_2, input_3,
+                                   context_1, context_2, context_3, test_set_type)
+    answers = await asyncio.gather(*[
+        _ask_safely_async(p.ask_async, p.label, prompt_kwargs) for p in providers
+    ])
+    return {p.name: answer for p, answer in zip(providers, answers)}
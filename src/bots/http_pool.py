@@ -0,0 +1,73 @@
+import sys
+sys.dont_write_bytecode = True
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+import config
+
+HTTP_POOL_SIZE = getattr(config, "HTTP_POOL_SIZE", 20)
+HTTP_CONNECT_TIMEOUT = getattr(config, "HTTP_CONNECT_TIMEOUT", 10.0)
+HTTP_READ_TIMEOUT = getattr(config, "HTTP_READ_TIMEOUT", 120.0)
+
+# (connect, read) tuple accepted by requests and by openai's request_timeout
+TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+# Per-provider (connect, read) overrides, e.g. {"deepseek": (5.0, 300.0)}
+PROVIDER_TIMEOUTS = getattr(config, "PROVIDER_TIMEOUTS", {})
+
+_lock = threading.Lock()
+_sessions = {}
+
+
+def get_session(provider):
+    """
+    Return the keep-alive session for a provider, creating it on first use.
+
+    One session per provider is shared by every thread; its adapter keeps up
+    to HTTP_POOL_SIZE open connections per host so concurrent calls reuse
+    sockets instead of paying a new TCP/TLS handshake each time.
+    """
+    with _lock:
+        session = _sessions.get(provider)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[provider] = session
+        return session
+
+
+def get_timeout(provider):
+    """(connect, read) timeout in seconds for a provider's requests."""
+    return tuple(PROVIDER_TIMEOUTS.get(provider, TIMEOUT))
+
+
+def pool_stats(provider):
+    """
+    Return connection reuse counters for a provider's session.
+
+    Returns:
+        Dictionary with connections (sockets opened) and requests (requests sent)
+    """
+    stats = {"connections": 0, "requests": 0}
+    session = _sessions.get(provider)
+    if session is None:
+        return stats
+
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                stats["connections"] += pool.num_connections
+                stats["requests"] += pool.num_requests
+    return stats
+
+
+def close():
+    """Close every provider session."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,214 @@
+import sys
+sys.dont_write_bytecode = True
+import asyncio
+import threading
+import time
+import config
+from bots import deadline
+
+# Per-provider quotas; None means unlimited. max_concurrency caps the AIMD window.
+RATE_LIMITS = getattr(config, "RATE_LIMITS", {
+    "chatgpt": {"rpm": 3500, "tpm": 90000, "max_concurrency": 32},
+    "deepseek": {"rpm": None, "tpm": None, "max_concurrency": 32},
+})
+RATE_LIMIT_MAX_RETRIES = getattr(config, "RATE_LIMIT_MAX_RETRIES", 6)
+
+# Rough completion size used to reserve tokens before the real usage is known
+EXPECTED_COMPLETION_TOKENS = 500
+
+_POLL_INTERVAL = 0.05
+
+
+class ThrottledError(Exception):
+    """Raised by a provider call when the provider answered HTTP 429."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given in seconds; returns None if absent or unparseable."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(prompt):
+    """Approximate token cost of a request (about 4 characters per token)."""
+    return len(prompt) // 4 + EXPECTED_COMPLETION_TOKENS
+
+
+class TokenBucket:
+    """Refilling allowance of `per_minute` units; the balance may go negative."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` units are available (0 if available now)."""
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= amount
+
+
+class ProviderLimiter:
+    """
+    Token-bucket limiter for one provider with an AIMD concurrency window.
+
+    Each successful call grows the window by about one slot per window's
+    worth of calls (additive increase); a 429 halves it (multiplicative
+    decrease) and pauses new calls for Retry-After seconds.
+    """
+
+    def __init__(self, rpm=None, tpm=None, max_concurrency=32, min_concurrency=1):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = float(min(max_concurrency, max(min_concurrency, 4)))
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens):
+        """Take a slot if allowed now; otherwise return the seconds to wait first."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.in_flight >= int(self.concurrency):
+                return _POLL_INTERVAL
+
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.wait_time(1, now))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(tokens)
+            self.in_flight += 1
+            return 0.0
+
+    def acquire(self, tokens):
+        while True:
+            deadline.check()
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(deadline.clamp_delay(wait))
+
+    async def acquire_async(self, tokens):
+        while True:
+            deadline.check()
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(deadline.clamp_delay(wait))
+
+    def release(self, throttled=False, retry_after=None, succeeded=True):
+        with self._lock:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+                pause = retry_after if retry_after is not None else 1.0
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            elif succeeded:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+
+    def record_usage(self, estimated, actual):
+        """Correct the token bucket once the real usage of a call is known."""
+        if self.tokens is None or actual is None:
+            return
+        with self._lock:
+            self.tokens.take(actual - estimated)
+
+
+_lock = threading.Lock()
+_limiters = {}
+
+
+def get_limiter(provider):
+    with _lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limits = RATE_LIMITS.get(provider, {})
+            limiter = ProviderLimiter(
+                rpm=limits.get("rpm"), tpm=limits.get("tpm"),
+                max_concurrency=limits.get("max_concurrency", 32)
+            )
+            _limiters[provider] = limiter
+        return limiter
+
+
+def call(provider, fn, tokens):
+    """
+    Run fn() within the provider's limits.
+
+    A ThrottledError from fn() shrinks the window, waits out Retry-After and
+    tries again, so throttling is not reported as a model failure unless it
+    persists for RATE_LIMIT_MAX_RETRIES attempts.
+    """
+    limiter = get_limiter(provider)
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        limiter.acquire(tokens)
+        try:
+            result = fn()
+        except ThrottledError as e:
+            limiter.release(throttled=True, retry_after=e.retry_after)
+            if attempt == RATE_LIMIT_MAX_RETRIES:
+                raise
+            continue
+        except Exception:
+            limiter.release(succeeded=False)
+            raise
+        limiter.release()
+        return result
+
+
+async def call_async(provider, fn, tokens):
+    """Async version of call(); fn is a coroutine function."""
+    limiter = get_limiter(provider)
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        await limiter.acquire_async(tokens)
+        try:
+            result = await fn()
+        except ThrottledError as e:
+            limiter.release(throttled=True, retry_after=e.retry_after)
+            if attempt == RATE_LIMIT_MAX_RETRIES:
+                raise
+            continue
+        except Exception:
+            limiter.release(succeeded=False)
+            raise
+        limiter.release()
+        return result
+
+
+def stats():
+    """Current concurrency window and 429 count for each provider."""
+    with _lock:
+        return {
+            provider: {"concurrency": int(limiter.concurrency), "throttled": limiter.throttled}
+            for provider, limiter in _limiters.items()
+        }
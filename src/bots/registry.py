@@ -0,0 +1,149 @@
+import sys
+sys.dont_write_bytecode = True
+import os
+import config
+from bots import chatgpt_client, deepseek_client, response_cache, single_flight
+from bots.prompt_builder import build_prompt
+
+# Client implementations a provider can use: the openai library, or a plain
+# HTTP client for any OpenAI-compatible chat completions endpoint
+CLIENTS = {
+    "chatgpt": (chatgpt_client.ask_chatgpt, chatgpt_client.ask_chatgpt_async, chatgpt_client.ask_chatgpt_stream),
+    "deepseek": (deepseek_client.ask_deepseek, deepseek_client.ask_deepseek_async, deepseek_client.ask_deepseek_stream),
+}
+
+# Model used when a provider does not name one
+CLIENT_MODELS = {
+    "chatgpt": chatgpt_client.CHATGPT_MODEL,
+    "deepseek": deepseek_client.DEEPSEEK_MODEL,
+}
+
+# Where a provider's requests go when it sets no url (part of the response cache key)
+CLIENT_ENDPOINTS = {
+    "chatgpt": chatgpt_client.resolve_endpoint,
+    "deepseek": deepseek_client.resolve_endpoint,
+}
+
+# http_pool session a provider's requests go through, given its name
+CLIENT_SESSIONS = {
+    "chatgpt": lambda name: chatgpt_client.HTTP_SESSION,
+    "deepseek": lambda name: name,
+}
+
+DEFAULT_PROVIDERS = [
+    {"name": "chatgpt", "label": "ChatGPT", "short_label": "GPT", "client": "chatgpt",
+     "model": chatgpt_client.CHATGPT_MODEL},
+    {"name": "deepseek", "label": "DeepSeek", "short_label": "DS", "client": "deepseek",
+     "model": deepseek_client.DEEPSEEK_MODEL},
+]
+
+PROVIDERS = getattr(config, "PROVIDERS", DEFAULT_PROVIDERS)
+
+
+class Provider:
+    """
+    One model to benchmark and the client used to call it.
+
+    `name` keys the result columns (e.g. "chatgpt_answer"), the response
+    cache, rate limits and circuit breaker; `label` is shown in reports and
+    error strings.
+
+    A provider with its own `url` needs its own key, given as `api_key` or
+    as the name of an environment variable holding it (`api_key_env`); the
+    global OPENAI_API_KEY / DEEPSEEK_API_KEY are only sent to the default
+    endpoints.
+    """
+
+    def __init__(self, name, label=None, client="chatgpt", model=None, short_label=None,
+                 params=None, url=None, api_key=None, api_key_env=None):
+        if client not in CLIENTS:
+            raise ValueError(f"Unknown client '{client}' for provider '{name}' (expected one of: {', '.join(CLIENTS)})")
+        if api_key_env:
+            api_key = os.environ.get(api_key_env)
+            if not api_key:
+                raise ValueError(f"Environment variable {api_key_env} (api_key_env of provider '{name}') is not set")
+        if url and not api_key:
+            raise ValueError(f"Provider '{name}' sets url but no api_key or api_key_env")
+        self.name = name
+        self.label = label or name
+        self.short_label = short_label or self.label
+        self.client = client
+        self.model = model or CLIENT_MODELS[client]
+        self.params = params or {}
+        self.url = url
+        self.api_key = api_key
+
+    def _client_kwargs(self):
+        return {"name": self.name, "label": self.label, "model": self.model,
+                "params": self.params or None, "url": self.url, "api_key": self.api_key}
+
+    def _flight_key(self, prompt_kwargs, clean):
+        endpoint = CLIENT_ENDPOINTS[self.client](self.url)
+        return (response_cache.make_key(self.name, self.model, build_prompt(**prompt_kwargs), self.params, endpoint),
+                clean)
+
+    def ask(self, clean=True, **prompt_kwargs):
+        """
+        Ask this provider; an identical request already in flight is joined instead of repeated.
+
+        clean=False returns the answer without clean_text() applied.
+        """
+        return single_flight.do(
+            self.name, self._flight_key(prompt_kwargs, clean),
+            lambda: CLIENTS[self.client][0](**prompt_kwargs, **self._client_kwargs(), clean=clean)
+        )
+
+    async def ask_async(self, clean=True, **prompt_kwargs):
+        return await single_flight.do_async(
+            self.name, self._flight_key(prompt_kwargs, clean),
+            lambda: CLIENTS[self.client][1](**prompt_kwargs, **self._client_kwargs(), clean=clean)
+        )
+
+    def is_error(self, answer):
+        """True if `answer` is an error string from this provider's client (or ask_all) rather than a reply."""
+        return isinstance(answer, str) and answer.startswith(f"[{self.label} Error] ")
+
+    def ask_stream(self, stop_check=None, **prompt_kwargs):
+        # Not coalesced: every stream has its own timing and stop check
+        return CLIENTS[self.client][2](stop_check=stop_check, **prompt_kwargs, **self._client_kwargs())
+
+    def __repr__(self):
+        return f"Provider({self.name!r}, model={self.model!r})"
+
+
+def get_provider(name):
+    """Look up a provider by name in PROVIDERS, falling back to the built-in ones."""
+    for spec in list(PROVIDERS) + DEFAULT_PROVIDERS:
+        if spec["name"] == name:
+            return Provider(**spec)
+    raise ValueError(f"Unknown provider '{name}' (configured: {', '.join(spec['name'] for spec in PROVIDERS)})")
+
+
+def get_providers(names=None):
+    """
+    Return the providers to benchmark, in report order.
+
+    Args:
+        names: Provider names to use; None means every provider in PROVIDERS
+
+    Returns:
+        List of Provider objects
+    """
+    if names is None:
+        names = [spec["name"] for spec in PROVIDERS]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate provider names: {', '.join(names)}")
+    return [get_provider(name) for name in names]
+
+
+def columns(providers):
+    """(name, label) pairs for the Excel writer."""
+    return [(provider.name, provider.label) for provider in providers]
+
+
+def sessions(providers):
+    """Names of the providers sharing each http_pool session, keyed by session."""
+    shared = {}
+    for provider in providers:
+        shared.setdefault(CLIENT_SESSIONS[provider.client](provider.name), []).append(provider.name)
+    return shared
@@ -0,0 +1,204 @@
+import sys
+sys.dont_write_bytecode = True
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+import aiohttp
+import openai
+import requests
+import config
+from bots import deadline
+from bots.rate_limiter import ThrottledError
+
+RETRY_MAX_ATTEMPTS = getattr(config, "RETRY_MAX_ATTEMPTS", 3)
+RETRY_BASE_DELAY = getattr(config, "RETRY_BASE_DELAY", 0.5)
+RETRY_MAX_DELAY = getattr(config, "RETRY_MAX_DELAY", 8.0)
+CIRCUIT_WINDOW = getattr(config, "CIRCUIT_WINDOW", 20)
+CIRCUIT_MIN_CALLS = getattr(config, "CIRCUIT_MIN_CALLS", 10)
+CIRCUIT_FAILURE_RATE = getattr(config, "CIRCUIT_FAILURE_RATE", 0.5)
+CIRCUIT_COOLDOWN = getattr(config, "CIRCUIT_COOLDOWN", 60.0)
+
+RETRYABLE_STATUSES = {408, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    """A transient provider failure (e.g. HTTP 503) that is worth retrying."""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+def is_retryable(e):
+    """True for network failures, timeouts and 5xx answers; False for everything else."""
+    if isinstance(e, RetryableError):
+        return True
+    if isinstance(e, requests.exceptions.HTTPError):
+        return e.response is not None and e.response.status_code in RETRYABLE_STATUSES
+    if isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                      requests.exceptions.ChunkedEncodingError)):
+        return True
+    if isinstance(e, (openai.error.APIConnectionError, openai.error.Timeout,
+                      openai.error.ServiceUnavailableError, openai.error.TryAgain)):
+        return True
+    if isinstance(e, openai.error.APIError):
+        return getattr(e, "http_status", None) in RETRYABLE_STATUSES
+    if isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+        return True
+    return False
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given retry (0-based)."""
+    ceiling = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of a provider's recent calls.
+
+    Once at least CIRCUIT_MIN_CALLS of the last CIRCUIT_WINDOW calls are in
+    and the failure rate reaches CIRCUIT_FAILURE_RATE, the circuit opens and
+    calls fail immediately for CIRCUIT_COOLDOWN seconds. After that a single
+    trial call is let through; its result closes or re-opens the circuit.
+    """
+
+    def __init__(self, name, window=CIRCUIT_WINDOW, min_calls=CIRCUIT_MIN_CALLS,
+                 failure_rate=CIRCUIT_FAILURE_RATE, cooldown=CIRCUIT_COOLDOWN):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.outcomes = deque(maxlen=window)
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError if the provider should not be called now."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at >= self.cooldown and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} circuit open after repeated failures; call skipped")
+
+    def record(self, succeeded):
+        with self._lock:
+            if self.trial_in_flight:
+                self.trial_in_flight = False
+                if succeeded:
+                    self.opened_at = None
+                    self.outcomes.clear()
+                else:
+                    self.opened_at = time.monotonic()
+                return
+
+            self.outcomes.append(succeeded)
+            failures = self.outcomes.count(False)
+            if (self.opened_at is None and len(self.outcomes) >= self.min_calls
+                    and failures / len(self.outcomes) >= self.failure_rate):
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """
+        End a call whose outcome says nothing about the provider's health
+        (throttled, out of time, cancelled): nothing is recorded, but a
+        half-open trial slot is freed so the next call can be the trial.
+        """
+        with self._lock:
+            self.trial_in_flight = False
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+
+_lock = threading.Lock()
+_breakers = {}
+
+
+def get_breaker(provider):
+    with _lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(provider)
+            _breakers[provider] = breaker
+        return breaker
+
+
+def call(provider, fn):
+    """
+    Run fn() behind the provider's circuit breaker, retrying transient failures.
+
+    The breaker sees one outcome per call, after retries. Non-retryable
+    errors and the last failed attempt are re-raised unchanged, so callers
+    keep producing the same error strings as before.
+    """
+    breaker = get_breaker(provider)
+    breaker.before_call()
+    try:
+        for attempt in range(RETRY_MAX_ATTEMPTS):
+            deadline.check()
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_retryable(e) or attempt == RETRY_MAX_ATTEMPTS - 1:
+                    raise
+                time.sleep(deadline.clamp_delay(backoff_delay(attempt)))
+                continue
+            breaker.record(True)
+            return result
+    except (ThrottledError, deadline.DeadlineExceeded):
+        # The provider answered but is busy, or we ran out of time; neither a failure nor a success
+        breaker.release()
+        raise
+    except Exception:
+        breaker.record(False)
+        raise
+    except BaseException:
+        # Cancelled (e.g. at the run deadline) or interrupted; not the provider's doing
+        breaker.release()
+        raise
+
+
+async def call_async(provider, fn):
+    """Async version of call(); fn is a coroutine function."""
+    breaker = get_breaker(provider)
+    breaker.before_call()
+    try:
+        for attempt in range(RETRY_MAX_ATTEMPTS):
+            deadline.check()
+            try:
+                result = await fn()
+            except Exception as e:
+                if not is_retryable(e) or attempt == RETRY_MAX_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(deadline.clamp_delay(backoff_delay(attempt)))
+                continue
+            breaker.record(True)
+            return result
+    except (ThrottledError, deadline.DeadlineExceeded):
+        breaker.release()
+        raise
+    except Exception:
+        breaker.record(False)
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+
+
+def stats():
+    """Circuit state and number of skipped calls for each provider."""
+    with _lock:
+        return {
+            provider: {"open": breaker.is_open, "rejected": breaker.rejected}
+            for provider, breaker in _breakers.items()
+        }
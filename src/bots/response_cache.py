@@ -0,0 +1,69 @@
+import sys
+sys.dont_write_bytecode = True
+import hashlib
+import json
+import os
+import threading
+import config
+from utils.disk_cache import DiskCache
+
+RESPONSE_CACHE_ENABLED = getattr(config, "RESPONSE_CACHE_ENABLED", True)
+RESPONSE_CACHE_PATH = getattr(config, "RESPONSE_CACHE_PATH", "cache/responses.sqlite3")
+RESPONSE_CACHE_MAX_MB = getattr(config, "RESPONSE_CACHE_MAX_MB", 200)
+RESPONSE_CACHE_TTL = getattr(config, "RESPONSE_CACHE_TTL", None)
+
+_lock = threading.Lock()
+_cache = None
+_enabled = RESPONSE_CACHE_ENABLED
+
+
+def make_key(provider, model, prompt, params=None, endpoint=None):
+    """
+    Content hash of everything that determines a provider's answer,
+    including the endpoint that gave it (so a mock server's answers are
+    never served for the real API).
+    """
+    material = json.dumps(
+        {"provider": provider, "model": model, "prompt": prompt, "params": params or {}, "endpoint": endpoint},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def set_enabled(enabled):
+    """Turn the cache on or off for this process (e.g. for a --no-cache run)."""
+    global _enabled
+    _enabled = enabled
+
+
+def _get_cache():
+    global _cache
+    with _lock:
+        if _cache is None:
+            path = RESPONSE_CACHE_PATH
+            if not os.path.isabs(path):
+                project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+                path = os.path.join(project_root, path)
+            _cache = DiskCache(path, max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024, ttl=RESPONSE_CACHE_TTL)
+        return _cache
+
+
+def get(provider, model, prompt, params=None, endpoint=None):
+    """Return the cached raw answer for this request, or None."""
+    if not _enabled:
+        return None
+    return _get_cache().get(make_key(provider, model, prompt, params, endpoint))
+
+
+def put(provider, model, prompt, answer, params=None, endpoint=None):
+    """Remember a successful raw answer. Errors must not be cached."""
+    if not _enabled:
+        return
+    _get_cache().set(make_key(provider, model, prompt, params, endpoint), answer)
+
+
+def stats():
+    """Hit/miss counts for this process."""
+    if _cache is None:
+        return {"hits": 0, "misses": 0, "bytes": 0}
+    return _cache.stats()
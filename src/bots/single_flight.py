@@ -0,0 +1,115 @@
+import sys
+sys.dont_write_bytecode = True
+import asyncio
+import threading
+import config
+
+SINGLE_FLIGHT_ENABLED = getattr(config, "SINGLE_FLIGHT_ENABLED", True)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent requests into one.
+
+    While a call for a key is in flight, later callers with the same key
+    wait for it and share its result (or exception) instead of making their
+    own call. Nothing is remembered once the call finishes; that is the
+    response cache's job.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = {}
+        self.coalesced = {}
+
+    def _count(self, provider):
+        self.coalesced[provider] = self.coalesced.get(provider, 0) + 1
+
+    def do(self, provider, key, fn):
+        """Return fn(), or the result of the identical call already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self._count(provider)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, provider, key, fn):
+        """Async version of do(); fn is a coroutine function."""
+        loop = asyncio.get_running_loop()
+        # Futures belong to one event loop, so calls only coalesce within a loop
+        flight_key = (id(loop), key)
+        with self._lock:
+            future = self._async_calls.get(flight_key)
+            leader = future is None
+            if leader:
+                future = loop.create_future()
+                self._async_calls[flight_key] = future
+            else:
+                self._count(provider)
+
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved; nobody may be waiting
+            raise
+        finally:
+            with self._lock:
+                del self._async_calls[flight_key]
+
+
+_group = SingleFlight()
+
+
+def do(provider, key, fn):
+    if not SINGLE_FLIGHT_ENABLED:
+        return fn()
+    return _group.do(provider, key, fn)
+
+
+async def do_async(provider, key, fn):
+    if not SINGLE_FLIGHT_ENABLED:
+        return await fn()
+    return await _group.do_async(provider, key, fn)
+
+
+def stats():
+    """Number of calls per provider that shared another call's result."""
+    with _group._lock:
+        return dict(_group.coalesced)
@@ -12,4 +12,125 @@ VISA_CSV = "data/visa_guidance_testcases.csv"
 # Test configuration
 MAX_TESTS = 5
 SCORE_THRESHOLD = 50.0
+# How answers are judged: "simple" (exact keywords), "enhanced" (keywords with
+# stems and synonyms) or "semantic" (offline TF-IDF similarity to expected_valid)
+VALIDATION_MODE = "enhanced"
+RESPONSE_PREVIEW_LENGTH = 200
 
+
+# Send each test case to ChatGPT and DeepSeek at the same time
+PARALLEL_PROVIDERS = True
+
+# Number of test cases run in parallel by main.py (override with --workers N)
+WORKERS = 1
+
+# Use the asyncio clients in main.py (same as --async); ASYNC_POOL_SIZE caps open sockets
+USE_ASYNC = False
+ASYNC_POOL_SIZE = 100
+
+# Keep-alive HTTP pool shared by all threads, and request timeouts in seconds
+HTTP_POOL_SIZE = 20
+HTTP_CONNECT_TIMEOUT = 10.0
+HTTP_READ_TIMEOUT = 120.0
+
+# On-disk cache of provider answers, keyed by provider, model and full prompt.
+# Size limit in MB (least recently used entries are evicted); TTL in seconds or None
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_PATH = "cache/responses.sqlite3"
+RESPONSE_CACHE_MAX_MB = 200
+RESPONSE_CACHE_TTL = None
+
+# Per-provider quotas (requests/min, tokens/min; None = unlimited) and the
+# ceiling for the adaptive concurrency window. HTTP 429s are retried after
+# Retry-After up to RATE_LIMIT_MAX_RETRIES times instead of failing the test.
+RATE_LIMITS = {
+    "chatgpt": {"rpm": 3500, "tpm": 90000, "max_concurrency": 32},
+    "deepseek": {"rpm": None, "tpm": None, "max_concurrency": 32},
+}
+RATE_LIMIT_MAX_RETRIES = 6
+
+# Retries for transient failures (network errors, timeouts, HTTP 5xx) with
+# exponential backoff and jitter, in seconds
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+# Circuit breaker: once CIRCUIT_FAILURE_RATE of the last CIRCUIT_WINDOW calls
+# (at least CIRCUIT_MIN_CALLS) fail, skip the provider for CIRCUIT_COOLDOWN seconds
+CIRCUIT_WINDOW = 20
+CIRCUIT_MIN_CALLS = 10
+CIRCUIT_FAILURE_RATE = 0.5
+CIRCUIT_COOLDOWN = 60.0
+
+# Stream answers (records time-to-first-token); EARLY_STOP ends a stream once
+# every expected keyword has appeared (keyword modes only; ignored in semantic mode)
+STREAMING = False
+EARLY_STOP = False
+
+# Models benchmarked in one run (select a subset with --providers a,b).
+# client "chatgpt" calls the model through the openai library, "deepseek"
+# through any OpenAI-compatible HTTP endpoint; optional keys: short_label
+# (console columns), params (extra request fields), url, api_key. A provider
+# with its own url must also set api_key, or api_key_env (the name of an
+# environment variable holding the key): OPENAI_API_KEY / DEEPSEEK_API_KEY
+# are only sent to the default endpoints.
+PROVIDERS = [
+    {"name": "chatgpt", "label": "ChatGPT", "short_label": "GPT", "client": "chatgpt", "model": "gpt-3.5-turbo"},
+    {"name": "deepseek", "label": "DeepSeek", "short_label": "DS", "client": "deepseek", "model": "deepseek-chat"},
+    # {"name": "gpt4o", "label": "GPT-4o", "short_label": "4o", "client": "chatgpt", "model": "gpt-4o",
+    #  "params": {"temperature": 0}},
+    # {"name": "local", "label": "Local", "client": "deepseek", "model": "llama3",
+    #  "url": "http://127.0.0.1:8080/v1/chat/completions", "api_key_env": "LOCAL_LLM_KEY"},
+]
+
+# Send requests to another OpenAI-compatible server instead of the real APIs,
+# e.g. the local mock (python src/mock_llm_server.py): OPENAI_BASE_URL =
+# "http://127.0.0.1:8000/v1", DEEPSEEK_BASE_URL = "http://127.0.0.1:8000".
+# The OPENAI_BASE_URL / DEEPSEEK_BASE_URL environment variables take precedence.
+OPENAI_BASE_URL = None
+DEEPSEEK_BASE_URL = None
+
+# Where main.py --batch-prepare writes one JSONL batch manifest per provider
+BATCH_DIR = "output/batch"
+
+# Share one request between test cases that send the same prompt to the same
+# provider at the same time, instead of paying for each copy
+SINGLE_FLIGHT_ENABLED = True
+
+# Per-provider (connect, read) timeouts in seconds; others use HTTP_*_TIMEOUT
+PROVIDER_TIMEOUTS = {
+    # "deepseek": (10.0, 300.0),
+}
+
+# Wall-clock budget in seconds for a whole main.py run (same as --deadline);
+# None = no limit. Unfinished cases are cancelled and partial results saved.
+RUN_DEADLINE = None
+
+# Semantic mode: similarity score (0-100) an answer needs to be Valid, and the
+# test case files whose texts weight rare words and phrases (IDF)
+SEMANTIC_THRESHOLD = 15.0
+SEMANTIC_IDF_CORPUS = [AIRLINE_CSV, VISA_CSV]
+
+# Worker processes that clean and judge answers for main.py --batch-ingest
+# (same as --judge-processes; 0 = one per CPU, 1 = no worker processes), and
+# how many answers each worker gets per task
+JUDGE_PROCESSES = 1
+JUDGE_CHUNK_SIZE = 256
+
+# Run main.py as a pipeline of stages with bounded queues between them
+# (same as --pipeline): prompt -> dispatch -> clean -> judge -> report.
+# PIPELINE_WORKERS sets threads per stage; "dispatch" defaults to WORKERS
+PIPELINE = False
+PIPELINE_QUEUE_SIZE = 16
+PIPELINE_WORKERS = {
+    # "judge": 2,
+}
+
+# Reuse earlier verdicts for the same answer, expected text, mode and
+# threshold; any change to the judge code invalidates them. Up to
+# VERDICT_CACHE_SIZE are kept in memory; set VERDICT_CACHE_PATH (e.g.
+# "cache/verdicts.sqlite3") to keep them between runs as well
+VERDICT_CACHE_ENABLED = True
+VERDICT_CACHE_SIZE = 50000
+VERDICT_CACHE_PATH = None
+VERDICT_CACHE_MAX_MB = 100
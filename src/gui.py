@@ -7,8 +7,7 @@ import tkinter as tk
 from tkinter import filedialog, scrolledtext, messagebox
 import threading
 from config import MAX_TESTS, SCORE_THRESHOLD, VALIDATION_MODE, AIRLINE_CSV, VISA_CSV
-from bots.chatgpt_client import ask_chatgpt
-from bots.deepseek_client import ask_deepseek
+from bots.fanout import ask_both
 from judge.llm_judge import judge_llm_response
 from utils.csv_loader import load_testcases
 from utils.excel_writer import save_results, save_summary
@@ -140,7 +139,7 @@ class TestVerificationGUI:
             self.append_output(f"Loading test cases from: {self.selected_path}\n")
             self.append_output(f"Max Tests: {MAX_TESTS}, Threshold: {SCORE_THRESHOLD}%, Mode: {VALIDATION_MODE}\n\n")
             
-            tests = load_testcases(self.selected_path)
+            tests = load_testcases(self.selected_path, limit=MAX_TESTS)
             if not tests:
                 self.append_output("No test cases found in file.\n")
                 return
@@ -166,32 +165,19 @@ class TestVerificationGUI:
                 context_3 = test_case.get("context_3", "")
                 expected_valid = test_case.get("expected_valid", "")
                 
-                # Ask ChatGPT
-                try:
-                    chatgpt_answer = ask_chatgpt(
-                        question=question, input_1=input_1, input_2=input_2, input_3=input_3,
-                        context_1=context_1, context_2=context_2, context_3=context_3,
-                        test_set_type=""
-                    )
-                except Exception as e:
-                    chatgpt_answer = f"[ChatGPT Error] {str(e)}"
-                
-                # Ask DeepSeek
-                try:
-                    deepseek_answer = ask_deepseek(
-                        question=question, input_1=input_1, input_2=input_2, input_3=input_3,
-                        context_1=context_1, context_2=context_2, context_3=context_3,
-                        test_set_type=""
-                    )
-                except Exception as e:
-                    deepseek_answer = f"[DeepSeek Error] {str(e)}"
+                # Ask ChatGPT and DeepSeek in parallel
+                chatgpt_answer, deepseek_answer = ask_both(
+                    question=question, input_1=input_1, input_2=input_2, input_3=input_3,
+                    context_1=context_1, context_2=context_2, context_3=context_3,
+                    test_set_type=""
+                )
                 
                 # Calculate accuracy (like CalculateAccuracy)
                 try:
                     chatgpt_judge = judge_llm_response(
                         question=question, llm_answer=chatgpt_answer,
                         expected_valid=expected_valid, expected_invalid=None,
-                        use_simple=use_simple
+                        use_simple=use_simple, mode=VALIDATION_MODE
                     )
                     chatgpt_score = chatgpt_judge.get("score", 0.0)
                     chatgpt_validity = chatgpt_judge.get("validity", "Unknown")
@@ -209,7 +195,7 @@ class TestVerificationGUI:
                     deepseek_judge = judge_llm_response(
                         question=question, llm_answer=deepseek_answer,
                         expected_valid=expected_valid, expected_invalid=None,
-                        use_simple=use_simple
+                        use_simple=use_simple, mode=VALIDATION_MODE
                     )
                     deepseek_score = deepseek_judge.get("score", 0.0)
                     deepseek_validity = deepseek_judge.get("validity", "Unknown")
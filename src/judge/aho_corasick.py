@@ -0,0 +1,73 @@
+import sys
+sys.dont_write_bytecode = True
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher (Aho-Corasick automaton).
+
+    Built once for a set of patterns; search() then reports which patterns
+    occur anywhere in a text in a single pass, however many patterns there
+    are. Transitions are precomputed for every state (a DFA), so scanning is
+    one dict lookup per character.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._transitions = [{}]
+        self._outputs = [frozenset()]
+        self._empty = frozenset(i for i, pattern in enumerate(self.patterns) if pattern == "")
+
+        outputs = [set()]
+        for i, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(self._transitions)
+                    self._transitions[state][char] = next_state
+                    self._transitions.append({})
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(i)
+
+        # Breadth-first: fill failure links and turn the trie into a full DFA
+        fail = [0] * len(self._transitions)
+        queue = deque(self._transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            for char, next_state in list(self._transitions[state].items()):
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in self._transitions[fallback]:
+                    fallback = fail[fallback]
+                target = self._transitions[fallback].get(char, 0)
+                fail[next_state] = target if target != next_state else 0
+            # Missing transitions follow the failure link's
+            if state:
+                for char, target in self._transitions[fail[state]].items():
+                    self._transitions[state].setdefault(char, target)
+
+        self._outputs = [frozenset(found) for found in outputs]
+
+    def search(self, texts):
+        """
+        Return the indexes of the patterns found in any of `texts`.
+
+        Each text is scanned separately, so a match never spans two texts.
+        """
+        found = set(self._empty)
+        total = len(self.patterns)
+        transitions = self._transitions
+        outputs = self._outputs
+        for text in texts:
+            state = 0
+            for char in text:
+                state = transitions[state].get(char, 0)
+                if outputs[state]:
+                    found |= outputs[state]
+            if len(found) == total:
+                break
+        return found
@@ -0,0 +1,157 @@
+import sys
+sys.dont_write_bytecode = True
+import numpy as np
+from config import SCORE_THRESHOLD, VALIDATION_MODE
+from judge.llm_judge import (
+    count_keyword_matches, count_keyword_matches_simple, get_judge_plan, get_validity_reason
+)
+from judge import verdict_cache
+from judge.semantic import judge_semantic
+
+
+def _no_keywords_result(reason):
+    return {
+        "score": 100.0,
+        "validity": "Valid",
+        "matched_keywords": 0,
+        "total_keywords": 0,
+        "per_keyword_status": [],
+        "expected_keywords_list": [],
+        "validity_reason": reason
+    }
+
+
+def _match_matrix(answers, plan, use_simple):
+    """
+    Answer x keyword boolean matrix for answers judged against one plan.
+
+    Also returns which rows were matched at all: empty or non-string
+    answers get no per-keyword status, as in judge_llm_response. Repeated
+    answers (error strings, cached replies) are matched once.
+    """
+    matrix = np.zeros((len(answers), len(plan.keywords)), dtype=bool)
+    answered = np.zeros(len(answers), dtype=bool)
+    seen = {}
+    for row, answer in enumerate(answers):
+        if not answer or not isinstance(answer, str):
+            continue
+        if answer in seen:
+            matrix[row] = matrix[seen[answer]]
+            answered[row] = True
+            continue
+        if use_simple:
+            _, status = count_keyword_matches_simple(answer, plan.keywords, patterns=plan.patterns)
+        else:
+            _, status = count_keyword_matches(answer, plan.keywords, stems=plan.stems)
+        matrix[row] = status
+        answered[row] = True
+        seen[answer] = row
+    return matrix, answered
+
+
+def _enhanced_scores(matches, totals):
+    """calculate_score's enhanced-mode multipliers over arrays of match counts."""
+    base = (matches / totals) * 100.0
+    few_keywords = np.where(matches >= 1, 100.0, 80.0)
+    some_keywords = np.where(matches >= 1, np.minimum(100.0, base * 2.5), base)
+    many_keywords = np.select(
+        [matches >= 2, matches >= 1],
+        [np.minimum(100.0, base * 2.8), np.minimum(100.0, base * 2.0)],
+        base
+    )
+    percentage = np.select([totals <= 2, totals <= 5], [few_keywords, some_keywords], many_keywords)
+    return np.minimum(percentage, 100.0)
+
+
+def _simple_scores(matches, totals):
+    """calculate_score_simple over arrays of match counts."""
+    return (matches / totals) * 100.0
+
+
+def judge_many(answers, expected, mode=VALIDATION_MODE):
+    """
+    Judge a whole run of answers at once.
+
+    Answers sharing an expected text are matched into one answer x keyword
+    matrix, and every row's score is then computed with array operations.
+    Verdicts already in judge.verdict_cache are not recomputed.
+
+    Args:
+        answers: LLM answers to judge
+        expected: Expected valid text for each answer, or one text for all
+        mode: 'simple' for exact keyword matching, 'semantic' for TF-IDF
+            similarity (see judge.semantic), anything else for enhanced
+
+    Returns:
+        List with one judge_llm_response() result dict per answer, in order
+    """
+    answers = list(answers)
+    if isinstance(expected, str) or expected is None:
+        expected = [expected] * len(answers)
+    else:
+        expected = list(expected)
+        if len(expected) != len(answers):
+            raise ValueError(f"Got {len(answers)} answers but {len(expected)} expected texts")
+    if mode not in ('simple', 'semantic'):
+        mode = 'enhanced'
+
+    keys = [verdict_cache.make_key(answer, expected_valid, None, mode) for answer, expected_valid in zip(answers, expected)]
+    results = [verdict_cache.get(key) for key in keys]
+    missing = [row for row, result in enumerate(results) if result is None]
+    if missing:
+        verdicts = _judge_uncached([answers[row] for row in missing], [expected[row] for row in missing], mode)
+        for row, verdict in zip(missing, verdicts):
+            verdict_cache.put(keys[row], verdict)
+            results[row] = verdict
+    return results
+
+
+def _judge_uncached(answers, expected, mode):
+    if mode == 'semantic':
+        return judge_semantic(answers, expected)
+    use_simple = (mode == 'simple')
+
+    results = [None] * len(answers)
+    groups = {}
+    for row, expected_valid in enumerate(expected):
+        # Non-string cells (e.g. NaN) have no keywords and may not be hashable
+        groups.setdefault(expected_valid if isinstance(expected_valid, str) else None, []).append(row)
+
+    scored = []
+    for expected_valid, rows in groups.items():
+        if not expected_valid or not expected_valid.strip():
+            for row in rows:
+                results[row] = _no_keywords_result("No expected output specified")
+            continue
+        plan = get_judge_plan(expected_valid)
+        if not plan.keywords:
+            for row in rows:
+                results[row] = _no_keywords_result("No keywords extracted from expected output")
+            continue
+        matrix, answered = _match_matrix([answers[row] for row in rows], plan, use_simple)
+        scored.append((plan, rows, matrix, answered))
+
+    if not scored:
+        return results
+
+    rows = np.concatenate([np.asarray(group_rows) for _, group_rows, _, _ in scored])
+    matches = np.concatenate([matrix.sum(axis=1) for _, _, matrix, _ in scored])
+    totals = np.concatenate([np.full(len(group_rows), len(plan.keywords)) for plan, group_rows, _, _ in scored])
+    percentages = _simple_scores(matches, totals) if use_simple else _enhanced_scores(matches, totals)
+    # Python's round(), not np.round, so scores equal calculate_score's to the last digit
+    scores = {row: round(percentage, 2) for row, percentage in zip(rows.tolist(), percentages.tolist())}
+
+    for plan, group_rows, matrix, answered in scored:
+        for position, row in enumerate(group_rows):
+            score = scores[row]
+            status = matrix[position].tolist() if answered[position] else []
+            results[row] = {
+                "score": score,
+                "validity": "Valid" if score >= SCORE_THRESHOLD else "Invalid",
+                "matched_keywords": sum(status),
+                "total_keywords": len(plan.keywords),
+                "per_keyword_status": status,
+                "expected_keywords_list": list(plan.keywords),
+                "validity_reason": get_validity_reason(score, answers[row], use_simple=use_simple)
+            }
+    return results
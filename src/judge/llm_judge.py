@@ -1,29 +1,109 @@
 import sys
 sys.dont_write_bytecode = True
 import re
+from collections import namedtuple
+from functools import lru_cache
 from config import SCORE_THRESHOLD
+from judge.aho_corasick import AhoCorasick
+from judge import verdict_cache
+from judge.semantic import judge_semantic
+from utils.text_cleaner import clean_text
 
 
-def extract_keywords(text):
+STOP_WORDS = frozenset({
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'her', 'was', 'one',
+    'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its', 'may', 'new', 'now',
+    'old', 'see', 'two', 'way', 'who', 'boy', 'did', 'its', 'let', 'put', 'say', 'she',
+    'too', 'use', 'that', 'this', 'with', 'from', 'have', 'they', 'been', 'more', 'than',
+    'will', 'about', 'after', 'which', 'their', 'these', 'there', 'other', 'when', 'where',
+    'would', 'could', 'should', 'might', 'must', 'shall', 'does', 'doesn', 'don'
+})
+
+
+def extract_keywords_ordered(text):
+    """Keywords of text as a tuple, each once, in order of first appearance."""
     if not text or not isinstance(text, str):
-        return set()
+        return ()
     
     text = text.lower().strip()
     words = re.findall(r'\b[a-z]{3,}\b', text)
-    
-    stop_words = {
-        'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'her', 'was', 'one',
-        'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its', 'may', 'new', 'now',
-        'old', 'see', 'two', 'way', 'who', 'boy', 'did', 'its', 'let', 'put', 'say', 'she',
-        'too', 'use', 'that', 'this', 'with', 'from', 'have', 'they', 'been', 'more', 'than',
-        'will', 'about', 'after', 'which', 'their', 'these', 'there', 'other', 'when', 'where',
-        'would', 'could', 'should', 'might', 'must', 'shall', 'does', 'doesn', 'don'
-    }
-    
-    keywords = {word for word in words if word not in stop_words}
-    return keywords
+    return tuple(dict.fromkeys(word for word in words if word not in STOP_WORDS))
+
+
+def extract_keywords(text):
+    return set(extract_keywords_ordered(text))
+
+
+SYNONYMS = {
+    'available': ['vary', 'offered', 'provided', 'exist', 'present', 'accessible', 'can', 'possible', 'offers'],
+    'depending': ['based', 'according', 'depending', 'upon', 'on'],
+    'duration': ['length', 'time', 'period', 'long', 'extended', 'hours', 'type'],
+    'options': ['choices', 'selections', 'alternatives', 'varieties', 'types', 'meals', 'meal'],
+    'require': ['need', 'must', 'necessary', 'mandatory', 'required'],
+    'permit': ['allow', 'enable', 'let', 'authorize', 'permission'],
+    'visa': ['visa', 'permit', 'authorization', 'document', 'entry'],
+    'citizen': ['citizen', 'national', 'resident', 'passport', 'holder', 'holders'],
+    'tourist': ['tourist', 'visitor', 'traveler', 'guest', 'visiting'],
+    'stay': ['remain', 'visit', 'reside', 'remain', 'reside'],
+    'meal': ['food', 'meal', 'dining', 'cuisine', 'eating', 'meals'],
+    'baggage': ['luggage', 'baggage', 'bags', 'suitcase', 'belongings'],
+    'carry': ['bring', 'carry', 'take', 'transport', 'bring'],
+    'check': ['check', 'checked', 'checking', 'verify', 'checked'],
+    'special': ['special', 'specific', 'custom', 'particular', 'unique'],
+    'restricted': ['restricted', 'limited', 'prohibited', 'banned', 'forbidden'],
+    'child': ['child', 'minor', 'kid', 'young', 'children'],
+    'minor': ['minor', 'child', 'kid', 'young'],
+    'airline': ['airline', 'carrier', 'aircraft', 'flight', 'company', 'emirates'],
+    'flight': ['flight', 'journey', 'trip', 'travel', 'traveling'],
+    'oversized': ['oversized', 'large', 'big', 'excess', 'over'],
+    'dietary': ['dietary', 'food', 'nutrition', 'diet', 'eating'],
+    'emirates': ['emirates', 'emirates', 'airline', 'ek'],
+    'dubai': ['dubai', 'uae', 'emirates', 'united'],
+    'uae': ['uae', 'dubai', 'emirates', 'united', 'arab'],
+    'receive': ['receive', 'get', 'obtain', 'granted', 'given', 'can'],
+    'typically': ['typically', 'usually', 'generally', 'normally', 'often'],
+    'affect': ['affect', 'impact', 'influence', 'change', 'alter', 'doesn'],
+    'regardless': ['regardless', 'irrespective', 'despite', 'even'],
+    'requested': ['requested', 'ordered', 'asked', 'booked', 'reserved'],
+    'advance': ['advance', 'before', 'prior', 'early', 'ahead'],
+    'properly': ['properly', 'correctly', 'appropriately', 'rightly'],
+    'declared': ['declared', 'stated', 'announced', 'reported', 'said'],
+    'allowed': ['allowed', 'permitted', 'authorized', 'approved', 'can'],
+    'service': ['service', 'serving', 'offering', 'provision'],
+    'short': ['short', 'brief', 'quick', 'limited'],
+    'stays': ['stays', 'visits', 'trips', 'periods'],
+    'arrival': ['arrival', 'arriving', 'entry', 'entering'],
+    'requirements': ['requirements', 'needs', 'rules', 'criteria'],
+    'nationality': ['nationality', 'citizenship', 'country', 'origin'],
+    'citizenship': ['citizenship', 'nationality', 'country', 'origin'],
+    'depend': ['depend', 'vary', 'based', 'depending'],
+    'apply': ['apply', 'affect', 'relevant', 'pertain'],
+    'restrictions': ['restrictions', 'limits', 'rules', 'regulations'],
+    'items': ['items', 'bags', 'luggage', 'belongings'],
+    'all': ['all', 'every', 'each', 'any'],
+    'flights': ['flights', 'trips', 'journeys', 'travel'],
+}
 
 
+def _build_synonym_index(synonyms):
+    """
+    Compile the synonym table into word -> set of synonyms.
+
+    The relation is symmetric: a key matches each of its listed words and
+    each listed word matches the key, exactly as the table is read.
+    """
+    index = {}
+    for key, values in synonyms.items():
+        for value in values:
+            index.setdefault(key, set()).add(value)
+            index.setdefault(value, set()).add(key)
+    return {word: frozenset(words) for word, words in index.items()}
+
+
+_SYNONYM_INDEX = _build_synonym_index(SYNONYMS)
+
+
+@lru_cache(maxsize=65536)
 def get_word_stem(word):
     """Get word stem for better matching."""
     if len(word) <= 4:
@@ -60,69 +140,48 @@ def are_words_similar(word1, word2):
             if stem1[:4] == stem2[:4] or stem1[-4:] == stem2[-4:]:
                 return True
     
-    synonyms = {
-        'available': ['vary', 'offered', 'provided', 'exist', 'present', 'accessible', 'can', 'possible', 'offers'],
-        'depending': ['based', 'according', 'depending', 'upon', 'on'],
-        'duration': ['length', 'time', 'period', 'long', 'extended', 'hours', 'type'],
-        'options': ['choices', 'selections', 'alternatives', 'varieties', 'types', 'meals', 'meal'],
-        'require': ['need', 'must', 'necessary', 'mandatory', 'required'],
-        'permit': ['allow', 'enable', 'let', 'authorize', 'permission'],
-        'visa': ['visa', 'permit', 'authorization', 'document', 'entry'],
-        'citizen': ['citizen', 'national', 'resident', 'passport', 'holder', 'holders'],
-        'tourist': ['tourist', 'visitor', 'traveler', 'guest', 'visiting'],
-        'stay': ['remain', 'visit', 'reside', 'remain', 'reside'],
-        'meal': ['food', 'meal', 'dining', 'cuisine', 'eating', 'meals'],
-        'baggage': ['luggage', 'baggage', 'bags', 'suitcase', 'belongings'],
-        'carry': ['bring', 'carry', 'take', 'transport', 'bring'],
-        'check': ['check', 'checked', 'checking', 'verify', 'checked'],
-        'special': ['special', 'specific', 'custom', 'particular', 'unique'],
-        'restricted': ['restricted', 'limited', 'prohibited', 'banned', 'forbidden'],
-        'child': ['child', 'minor', 'kid', 'young', 'children'],
-        'minor': ['minor', 'child', 'kid', 'young'],
-        'airline': ['airline', 'carrier', 'aircraft', 'flight', 'company', 'emirates'],
-        'flight': ['flight', 'journey', 'trip', 'travel', 'traveling'],
-        'oversized': ['oversized', 'large', 'big', 'excess', 'over'],
-        'dietary': ['dietary', 'food', 'nutrition', 'diet', 'eating'],
-        'emirates': ['emirates', 'emirates', 'airline', 'ek'],
-        'dubai': ['dubai', 'uae', 'emirates', 'united'],
-        'uae': ['uae', 'dubai', 'emirates', 'united', 'arab'],
-        'receive': ['receive', 'get', 'obtain', 'granted', 'given', 'can'],
-        'typically': ['typically', 'usually', 'generally', 'normally', 'often'],
-        'affect': ['affect', 'impact', 'influence', 'change', 'alter', 'doesn'],
-        'regardless': ['regardless', 'irrespective', 'despite', 'even'],
-        'requested': ['requested', 'ordered', 'asked', 'booked', 'reserved'],
-        'advance': ['advance', 'before', 'prior', 'early', 'ahead'],
-        'properly': ['properly', 'correctly', 'appropriately', 'rightly'],
-        'declared': ['declared', 'stated', 'announced', 'reported', 'said'],
-        'allowed': ['allowed', 'permitted', 'authorized', 'approved', 'can'],
-        'service': ['service', 'serving', 'offering', 'provision'],
-        'short': ['short', 'brief', 'quick', 'limited'],
-        'stays': ['stays', 'visits', 'trips', 'periods'],
-        'arrival': ['arrival', 'arriving', 'entry', 'entering'],
-        'requirements': ['requirements', 'needs', 'rules', 'criteria'],
-        'nationality': ['nationality', 'citizenship', 'country', 'origin'],
-        'citizenship': ['citizenship', 'nationality', 'country', 'origin'],
-        'depend': ['depend', 'vary', 'based', 'depending'],
-        'apply': ['apply', 'affect', 'relevant', 'pertain'],
-        'restrictions': ['restrictions', 'limits', 'rules', 'regulations'],
-        'items': ['items', 'bags', 'luggage', 'belongings'],
-        'all': ['all', 'every', 'each', 'any'],
-        'flights': ['flights', 'trips', 'journeys', 'travel'],
-    }
-    
-    for key, values in synonyms.items():
-        if word1 == key and word2 in values:
-            return True
-        if word2 == key and word1 in values:
-            return True
-    
-    return False
+    return word2 in _SYNONYM_INDEX.get(word1, ())
+
+
+# Keyword sets at least this large are matched with one Aho-Corasick pass;
+# smaller ones are faster as one C-level substring search per keyword
+AHO_CORASICK_MIN_KEYWORDS = 160
+
+
+@lru_cache(maxsize=4096)
+def _simple_matcher(keywords):
+    """Automaton over the letters-only keywords of a keyword set, built once per set."""
+    letter_keywords = [i for i, keyword in enumerate(keywords) if re.fullmatch(r'[a-z]+', keyword)]
+    return letter_keywords, AhoCorasick([keywords[i] for i in letter_keywords])
+
+
+def _find_keywords_ascii(answer_lower, keywords):
+    """
+    Which keywords occur in an ASCII answer, as a list of booleans.
+
+    A letters-only keyword can only occur inside a run of letters, so the
+    automaton scans each distinct run once instead of the whole answer.
+    """
+    if len(keywords) < AHO_CORASICK_MIN_KEYWORDS:
+        return [keyword in answer_lower for keyword in keywords]
+
+    letter_keywords, automaton = _simple_matcher(tuple(keywords))
+    status = [False] * len(keywords)
+    if len(letter_keywords) < len(keywords):
+        status = [keyword in answer_lower for keyword in keywords]
+    found = automaton.search(set(re.findall(r'[a-z]+', answer_lower)))
+    for i, keyword_index in enumerate(letter_keywords):
+        status[keyword_index] = i in found
+    return status
 
 
-def count_keyword_matches_simple(llm_answer, expected_keywords):
+def count_keyword_matches_simple(llm_answer, expected_keywords, patterns=None):
     """
     Simple regex matching approach (aligned with sample group).
     Uses case-insensitive exact match like the C# implementation.
+
+    `patterns` may hold one precompiled case-insensitive pattern per keyword
+    (a JudgePlan's) for answers that are not plain ASCII.
     """
     if not llm_answer or not isinstance(llm_answer, str):
         return 0, []
@@ -131,25 +190,88 @@ def count_keyword_matches_simple(llm_answer, expected_keywords):
         return 0, []
     
     answer_lower = llm_answer.lower()
-    matches = 0
-    match_status = []
+    keywords_lower = [expected_word.lower() for expected_word in expected_keywords]
     
-    for expected_word in expected_keywords:
-        # Simple case-insensitive regex match (like sample group's Regex.Match with IgnoreCase)
-        pattern = re.escape(expected_word.lower())
-        if re.search(pattern, answer_lower, re.IGNORECASE):
-            matches += 1
-            match_status.append(True)
-        else:
-            match_status.append(False)
+    if answer_lower.isascii() and all(keyword.isascii() for keyword in keywords_lower):
+        # Case-insensitive search of lowercase ASCII is plain substring search
+        match_status = _find_keywords_ascii(answer_lower, keywords_lower)
+    else:
+        # Unicode case folding (e.g. "ſ" matches "s") needs the regex engine
+        if patterns is None:
+            patterns = [re.compile(re.escape(keyword), re.IGNORECASE) for keyword in keywords_lower]
+        match_status = [pattern.search(answer_lower) is not None for pattern in patterns]
     
-    return matches, match_status
+    return sum(match_status), match_status
+
+
+class AnswerIndex:
+    """
+    An answer tokenised once for enhanced keyword matching.
+
+    Holds the answer's words, their stems and the stem/word prefixes and
+    suffixes that are_words_similar and the 3-letter partial match compare,
+    so each expected keyword is resolved with a few set lookups instead of
+    a pass over every answer word.
+    """
+
+    def __init__(self, llm_answer):
+        self.text = llm_answer.lower()
+        self.words = frozenset(re.findall(r'\b[a-z]{3,}\b', self.text))
+        self.stems = frozenset(get_word_stem(word) for word in self.words)
+        self.long_stems = frozenset(stem for stem in self.stems if len(stem) >= 3)
+        self.stem_prefixes = frozenset(stem[:4] for stem in self.stems if len(stem) >= 4)
+        self.stem_suffixes = frozenset(stem[-4:] for stem in self.stems if len(stem) >= 4)
+        self.word_prefixes = frozenset(word[:3] for word in self.words)
+        # Newline-joined so one substring search covers every stem/word; answer words never contain "\n"
+        self._joined_stems = "\n".join(self.long_stems)
+        self._joined_words = "\n".join(self.words)
+
+    def has_similar_word(self, word, stem=None):
+        """Same as any(are_words_similar(word, w) for w in self.words).
+
+        `stem` is get_word_stem(word), if the caller already has it."""
+        if not self.words:
+            return False
+        if word in self.words:
+            return True
+
+        if stem is None:
+            stem = get_word_stem(word)
+        if stem in self.stems:
+            return True
+        if len(stem) >= 3:
+            if "\n" in stem:
+                return any(are_words_similar(word, answer_word) for answer_word in self.words)
+            # stem inside an answer stem, or an answer stem inside stem
+            if stem in self._joined_stems:
+                return True
+            for start in range(len(stem) - 2):
+                for end in range(start + 3, len(stem) + 1):
+                    if stem[start:end] in self.long_stems:
+                        return True
+            if len(stem) >= 4 and (stem[:4] in self.stem_prefixes or stem[-4:] in self.stem_suffixes):
+                return True
 
+        synonyms = _SYNONYM_INDEX.get(word)
+        return synonyms is not None and not synonyms.isdisjoint(self.words)
 
-def count_keyword_matches(llm_answer, expected_keywords):
+    def has_partial_word(self, expected_word):
+        """Same as the 3-letter partial match loop: a word containing the
+        keyword's first 3 letters, or whose first 3 letters are in the keyword."""
+        prefix = expected_word[:3].lower()
+        if "\n" not in prefix and prefix in self._joined_words:
+            return True
+        expected_lower = expected_word.lower()
+        return any(expected_lower[i:i + 3] in self.word_prefixes for i in range(len(expected_lower) - 2))
+
+
+def count_keyword_matches(llm_answer, expected_keywords, index=None, stems=None):
     """
     Enhanced matching with similarity checking (current approach).
     Also returns per-keyword match status for detailed analysis.
+
+    Pass a prebuilt AnswerIndex of llm_answer as `index` to reuse it, and
+    the keywords' stems (a JudgePlan's) as `stems` to skip stemming them.
     """
     if not llm_answer or not isinstance(llm_answer, str):
         return 0, []
@@ -157,42 +279,66 @@ def count_keyword_matches(llm_answer, expected_keywords):
     if not expected_keywords:
         return 0, []
     
-    answer_lower = llm_answer.lower()
-    answer_words = set(re.findall(r'\b[a-z]{3,}\b', answer_lower))
+    if index is None:
+        index = AnswerIndex(llm_answer)
     
     matches = 0
     match_status = []
     
-    for expected_word in expected_keywords:
-        matched = False
-        # First try exact match (case-insensitive)
-        if expected_word.lower() in answer_lower:
+    if stems is None:
+        stems = [None] * len(expected_keywords)
+    
+    for expected_word, stem in zip(expected_keywords, stems):
+        expected_lower = expected_word.lower()
+        # Exact match first, then similarity, then the 3-letter partial match
+        matched = (
+            expected_lower in index.text
+            or index.has_similar_word(expected_lower, stem)
+            or (len(expected_word) >= 4 and index.has_partial_word(expected_word))
+        )
+        if matched:
             matches += 1
-            matched = True
-            match_status.append(True)
-        else:
-            # Try similarity matching
-            for answer_word in answer_words:
-                if are_words_similar(expected_word.lower(), answer_word):
-                    matches += 1
-                    matched = True
-                    match_status.append(True)
-                    break
-            if not matched and len(expected_word) >= 4:
-                # Try partial match
-                for answer_word in answer_words:
-                    if expected_word[:3].lower() in answer_word or answer_word[:3] in expected_word.lower():
-                        matches += 1
-                        matched = True
-                        match_status.append(True)
-                        break
-            
-            if not matched:
-                match_status.append(False)
+        match_status.append(matched)
     
     return matches, match_status
 
 
+JudgePlan = namedtuple("JudgePlan", ["expected_valid", "keywords", "stems", "patterns"])
+JudgePlan.__doc__ = """
+Everything the judge derives from one expected_valid text, computed once.
+
+keywords are in order of first appearance, so per-keyword results line up
+the same way for every answer; stems and patterns hold each keyword's stem
+and case-insensitive pattern, in the same order.
+"""
+
+
+@lru_cache(maxsize=4096)
+def get_judge_plan(expected_valid):
+    """
+    Return the (cached) JudgePlan for an expected_valid text.
+
+    A missing or blank expected text gives a plan with no keywords.
+    """
+    if not expected_valid or not isinstance(expected_valid, str) or not expected_valid.strip():
+        keywords = ()
+    else:
+        keywords = extract_keywords_ordered(expected_valid)
+    return JudgePlan(
+        expected_valid=expected_valid,
+        keywords=keywords,
+        stems=tuple(get_word_stem(keyword) for keyword in keywords),
+        patterns=tuple(re.compile(re.escape(keyword), re.IGNORECASE) for keyword in keywords)
+    )
+
+
+def _plan_for(expected_valid, plan):
+    if plan is not None:
+        return plan
+    # Non-string cells (e.g. NaN) have no keywords and may not be hashable
+    return get_judge_plan(expected_valid if isinstance(expected_valid, str) else None)
+
+
 def calculate_score_simple(matches, total_keywords):
     """
     Simple percentage calculation (aligned with sample group).
@@ -203,23 +349,27 @@ def calculate_score_simple(matches, total_keywords):
     return round((matches / total_keywords) * 100.0, 2)
 
 
-def calculate_score(llm_answer, expected_valid, use_simple=False):
+def calculate_score(llm_answer, expected_valid, use_simple=False, plan=None):
     """
     Calculate score using either simple or enhanced matching.
+
+    Pass get_judge_plan(expected_valid) as `plan` when scoring several
+    answers against the same expected text.
     """
     if not expected_valid or not isinstance(expected_valid, str) or not expected_valid.strip():
         return 100.0, []
     
-    expected_keywords = extract_keywords(expected_valid)
+    plan = _plan_for(expected_valid, plan)
+    expected_keywords = plan.keywords
     
     if not expected_keywords:
         return 100.0, []
     
     if use_simple:
-        matches, match_status = count_keyword_matches_simple(llm_answer, list(expected_keywords))
+        matches, match_status = count_keyword_matches_simple(llm_answer, expected_keywords, patterns=plan.patterns)
         percentage = calculate_score_simple(matches, len(expected_keywords))
     else:
-        matches, match_status = count_keyword_matches(llm_answer, list(expected_keywords))
+        matches, match_status = count_keyword_matches(llm_answer, expected_keywords, stems=plan.stems)
         # Enhanced scoring with multipliers
         if len(expected_keywords) <= 2:
             percentage = 100.0 if matches >= 1 else 80.0
@@ -255,7 +405,47 @@ def get_validity_reason(score, llm_answer, use_simple=False):
         return "Low Accuracy"
 
 
-def judge_llm_response(question, llm_answer, expected_valid, expected_invalid=None, use_simple=False):
+class StreamingCoverage:
+    """
+    Incremental keyword check for a streamed answer.
+
+    feed() each chunk as it arrives; it returns True once every keyword of
+    expected_valid appears in the cleaned text so far. Past that point more
+    text cannot lower the score (every keyword already matches exactly), so
+    the stream can be stopped without changing the verdict. That holds for
+    the keyword judges only, not semantic mode (see main.run_case).
+    """
+
+    def __init__(self, expected_valid, plan=None):
+        self.keywords = list(_plan_for(expected_valid, plan).keywords)
+        # Enough trailing text to catch a keyword split across two chunks
+        self._overlap = max((len(keyword) for keyword in self.keywords), default=1) - 1
+        self.reset()
+
+    def reset(self):
+        self._parts = []
+        self._tail = ""
+        self.pending = set(self.keywords)
+
+    def feed(self, chunk):
+        self._parts.append(chunk)
+        window = self._tail + chunk.lower()
+        self.pending = {keyword for keyword in self.pending if keyword not in window}
+        self._tail = window[-self._overlap:] if self._overlap else ""
+
+        if self.pending or not self.keywords:
+            return False
+
+        # Confirm against the cleaned text; an open code fence may still be removed
+        text = "".join(self._parts)
+        if text.count("```") % 2:
+            return False
+        cleaned = clean_text(text).lower()
+        return all(keyword in cleaned for keyword in self.keywords)
+
+
+def judge_llm_response(question, llm_answer, expected_valid, expected_invalid=None, use_simple=False, plan=None,
+                       mode=None):
     """
     Judge LLM response with per-keyword tracking and specific validity reasons.
     
@@ -265,11 +455,27 @@ def judge_llm_response(question, llm_answer, expected_valid, expected_invalid=No
         expected_valid: Expected valid response text
         expected_invalid: Expected invalid response text (optional)
         use_simple: If True, use simple regex matching (aligned with sample group)
+        plan: get_judge_plan(expected_valid), to share it across answers (optional)
+        mode: 'semantic' to score by TF-IDF similarity instead of keywords (see judge.semantic)
     
     Returns:
         Dictionary with score, validity, matched_keywords, total_keywords,
         per_keyword_status, expected_keywords_list, and validity_reason
+        (served from judge.verdict_cache when the same inputs were judged before)
     """
+    mode = 'semantic' if mode == 'semantic' else ('simple' if use_simple else 'enhanced')
+    cache_key = verdict_cache.make_key(llm_answer, expected_valid, expected_invalid, mode)
+    verdict = verdict_cache.get(cache_key)
+    if verdict is None:
+        if mode == 'semantic':
+            verdict = judge_semantic([llm_answer], [expected_valid])[0]
+        else:
+            verdict = _judge_keywords(llm_answer, expected_valid, use_simple, plan)
+        verdict_cache.put(cache_key, verdict)
+    return verdict
+
+
+def _judge_keywords(llm_answer, expected_valid, use_simple, plan):
     if not expected_valid or not isinstance(expected_valid, str) or not expected_valid.strip():
         return {
             "score": 100.0,
@@ -281,7 +487,8 @@ def judge_llm_response(question, llm_answer, expected_valid, expected_invalid=No
             "validity_reason": "No expected output specified"
         }
     
-    expected_keywords = extract_keywords(expected_valid)
+    plan = _plan_for(expected_valid, plan)
+    expected_keywords = plan.keywords
     expected_keywords_list = list(expected_keywords)
     
     if not expected_keywords:
@@ -295,7 +502,7 @@ def judge_llm_response(question, llm_answer, expected_valid, expected_invalid=No
             "validity_reason": "No keywords extracted from expected output"
         }
     
-    score, match_status = calculate_score(llm_answer, expected_valid, use_simple=use_simple)
+    score, match_status = calculate_score(llm_answer, expected_valid, use_simple=use_simple, plan=plan)
     
     # Count matches for backward compatibility
     matches = sum(1 for status in match_status if status)
@@ -0,0 +1,114 @@
+import sys
+sys.dont_write_bytecode = True
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import config
+from config import VALIDATION_MODE
+from judge import semantic
+from judge.batch_judge import judge_many
+from utils.text_cleaner import clean_text
+
+# Worker processes for judging (0 = one per CPU, 1 = judge in this process)
+JUDGE_PROCESSES = getattr(config, "JUDGE_PROCESSES", 1)
+# Answers sent to a worker per task; larger chunks mean fewer round trips
+JUDGE_CHUNK_SIZE = getattr(config, "JUDGE_CHUNK_SIZE", 256)
+
+_lock = threading.Lock()
+_pool = None
+_pool_size = 0
+
+
+def _init_worker(mode):
+    # Importing judge.llm_judge already compiled the synonym index; the IDF
+    # table is the other per-process cost, paid here instead of in the first chunk
+    if mode == 'semantic':
+        semantic._idf()
+
+
+def _judge_chunk(answers, expected, mode, clean):
+    if any(clean):
+        answers = [
+            clean_text(answer) if wanted and isinstance(answer, str) else answer
+            for answer, wanted in zip(answers, clean)
+        ]
+    return answers, judge_many(answers, expected, mode)
+
+
+def _process_count(processes):
+    if processes == 0:
+        return os.cpu_count() or 1
+    return processes
+
+
+def get_pool(processes, mode=VALIDATION_MODE):
+    """Return the shared judge process pool, starting it (or resizing it) on demand."""
+    global _pool, _pool_size
+    with _lock:
+        if _pool is None or _pool_size != processes:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(mode,))
+            _pool_size = processes
+        return _pool
+
+
+def close():
+    """Stop the worker processes."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def judge_parallel(answers, expected, mode=VALIDATION_MODE, clean=False,
+                   processes=JUDGE_PROCESSES, chunk_size=JUDGE_CHUNK_SIZE):
+    """
+    judge_many() spread over worker processes, for suites too big for one core.
+
+    Rows are ordered by expected text before chunking, so each worker
+    builds a judge plan once and reuses it for the rest of its chunk (and
+    later chunks, since plans are cached per process). Small inputs, or
+    processes=1, are judged in this process.
+
+    Args:
+        answers: LLM answers to judge
+        expected: Expected valid text for each answer (same length)
+        mode: Judge mode, as VALIDATION_MODE
+        clean: Run clean_text() on the answers (in the workers) before judging;
+            True for all of them, or one boolean per answer
+        processes: Worker count; 0 means one per CPU
+        chunk_size: Answers per task sent to a worker
+
+    Returns:
+        Tuple of (answers as judged, list of result dicts), both in input order
+    """
+    answers = list(answers)
+    expected = list(expected)
+    if len(expected) != len(answers):
+        raise ValueError(f"Got {len(answers)} answers but {len(expected)} expected texts")
+    if clean is True:
+        clean = [True] * len(answers)
+    clean = list(clean) if clean else [False] * len(answers)
+    processes = _process_count(processes)
+    if processes <= 1 or len(answers) <= chunk_size:
+        return _judge_chunk(answers, expected, mode, clean)
+
+    order = sorted(range(len(answers)), key=lambda row: str(expected[row]))
+    chunks = [order[start:start + chunk_size] for start in range(0, len(order), chunk_size)]
+    pool = get_pool(processes, mode)
+    futures = [
+        pool.submit(_judge_chunk, [answers[row] for row in chunk], [expected[row] for row in chunk], mode,
+                    [clean[row] for row in chunk])
+        for chunk in chunks
+    ]
+
+    judged_answers = [None] * len(answers)
+    verdicts = [None] * len(answers)
+    for chunk, future in zip(chunks, futures):
+        chunk_answers, chunk_verdicts = future.result()
+        for row, answer, verdict in zip(chunk, chunk_answers, chunk_verdicts):
+            judged_answers[row] = answer
+            verdicts[row] = verdict
+    return judged_answers, verdicts
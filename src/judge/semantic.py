@@ -0,0 +1,165 @@
+import sys
+sys.dont_write_bytecode = True
+import re
+from functools import lru_cache
+import numpy as np
+import config
+from config import AIRLINE_CSV, VISA_CSV
+from utils.csv_loader import load_testcases
+
+# Score (cosine similarity x 100) an answer needs to count as Valid in semantic mode
+SEMANTIC_THRESHOLD = getattr(config, "SEMANTIC_THRESHOLD", 15.0)
+# Test case files whose texts set the IDF weights
+SEMANTIC_IDF_CORPUS = getattr(config, "SEMANTIC_IDF_CORPUS", [AIRLINE_CSV, VISA_CSV])
+
+NGRAM_RANGE = (3, 5)
+HASH_BITS = 18
+_HASH_PRIME = np.uint64(0x100000001B3)
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+_IDF_FIELDS = ("question", "context_1", "context_2", "context_3", "expected_valid")
+
+
+def _normalise(text):
+    # Word boundaries become single spaces, so n-grams at a word's edges are marked
+    return " " + " ".join(re.findall(r'\w+', text.lower())) + " "
+
+
+def _hash_ngrams(text):
+    """Hash bucket of every character n-gram of text (NGRAM_RANGE), computed as arrays."""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    buckets = []
+    hashes = np.zeros(len(codes), dtype=np.uint64)
+    for n in range(1, NGRAM_RANGE[1] + 1):
+        # Polynomial rolling hash: hashes[i] covers codes[i:i + n]; uint64 wraps around
+        hashes = hashes[:len(codes) - n + 1] * _HASH_PRIME + codes[n - 1:]
+        if n >= NGRAM_RANGE[0]:
+            buckets.append(((hashes + np.uint64(n)) * _HASH_MIX) >> np.uint64(64 - HASH_BITS))
+    return np.concatenate(buckets).astype(np.int64)
+
+
+@lru_cache(maxsize=8192)
+def _term_counts(text):
+    """(sorted unique buckets, counts) of a text's n-grams."""
+    return np.unique(_hash_ngrams(_normalise(text)), return_counts=True)
+
+
+@lru_cache(maxsize=1)
+def _idf():
+    """
+    Smoothed IDF per hash bucket, fitted on the test suite texts.
+
+    Files that cannot be read are skipped; with no texts at all every
+    bucket weighs the same.
+    """
+    documents = []
+    for path in SEMANTIC_IDF_CORPUS:
+        try:
+            test_cases = load_testcases(path)
+        except OSError:
+            continue
+        for test_case in test_cases:
+            documents.extend(test_case[field] for field in _IDF_FIELDS if test_case.get(field))
+    documents = list(dict.fromkeys(documents))
+
+    document_frequency = np.zeros(1 << HASH_BITS)
+    for document in documents:
+        document_frequency[_term_counts(document)[0]] += 1
+    return np.log((1 + len(documents)) / (1 + document_frequency)) + 1.0
+
+
+@lru_cache(maxsize=8192)
+def vectorise(text):
+    """
+    Sparse TF-IDF vector of text as (sorted bucket indexes, L2-normalised weights).
+
+    Term frequency is sublinear (1 + log tf), so a repeated phrase does not
+    swamp the rest of the answer.
+    """
+    buckets, counts = _term_counts(text)
+    weights = (1.0 + np.log(counts)) * _idf()[buckets]
+    norm = np.sqrt(np.dot(weights, weights))
+    if norm:
+        weights = weights / norm
+    return buckets, weights
+
+
+def similarities(pairs):
+    """
+    Cosine similarity of each (answer, expected) text pair, in one batch.
+
+    Each pair's buckets are offset into their own range so a single sorted
+    intersection finds the shared terms of every pair at once.
+
+    Returns:
+        NumPy array of similarities in [0, 1], one per pair
+    """
+    if not pairs:
+        return np.zeros(0)
+    span = 1 << HASH_BITS
+    answer_keys, answer_weights, expected_keys, expected_weights = [], [], [], []
+    for pair_number, (answer, expected) in enumerate(pairs):
+        buckets, weights = vectorise(answer)
+        answer_keys.append(buckets + pair_number * span)
+        answer_weights.append(weights)
+        buckets, weights = vectorise(expected)
+        expected_keys.append(buckets + pair_number * span)
+        expected_weights.append(weights)
+
+    shared, answer_at, expected_at = np.intersect1d(
+        np.concatenate(answer_keys), np.concatenate(expected_keys),
+        assume_unique=True, return_indices=True
+    )
+    products = np.concatenate(answer_weights)[answer_at] * np.concatenate(expected_weights)[expected_at]
+    return np.clip(np.bincount(shared // span, weights=products, minlength=len(pairs)), 0.0, 1.0)
+
+
+def get_validity_reason(score, llm_answer):
+    """Validity reason for a semantic score."""
+    if not llm_answer or not isinstance(llm_answer, str) or not llm_answer.strip():
+        return "No Response"
+    if score >= SEMANTIC_THRESHOLD:
+        return f"Response was similar to the expected output (>= {SEMANTIC_THRESHOLD}%)"
+    return "Low Similarity"
+
+
+def judge_semantic(answers, expected):
+    """
+    Score answers by TF-IDF cosine similarity to their expected texts.
+
+    Needs no network or model: texts are embedded with hashed character
+    n-grams. Results have the same keys as judge_llm_response(); the score
+    is the similarity as a percentage and no keywords are reported.
+
+    Args:
+        answers: LLM answers to judge
+        expected: Expected valid text for each answer (same length)
+
+    Returns:
+        List of result dicts, one per answer
+    """
+    results = [None] * len(answers)
+    pairs, pair_rows = [], []
+    for row, (answer, expected_valid) in enumerate(zip(answers, expected)):
+        if not expected_valid or not isinstance(expected_valid, str) or not expected_valid.strip():
+            reason = "No expected output specified"
+            results[row] = {"score": 100.0, "validity": "Valid", "validity_reason": reason}
+        elif not answer or not isinstance(answer, str):
+            results[row] = {"score": 0.0}
+        else:
+            pairs.append((answer, expected_valid))
+            pair_rows.append(row)
+
+    for row, similarity in zip(pair_rows, similarities(pairs).tolist()):
+        results[row] = {"score": round(similarity * 100.0, 2)}
+
+    for row, result in enumerate(results):
+        if "validity" not in result:
+            result["validity"] = "Valid" if result["score"] >= SEMANTIC_THRESHOLD else "Invalid"
+            result["validity_reason"] = get_validity_reason(result["score"], answers[row])
+        result.update({
+            "matched_keywords": 0,
+            "total_keywords": 0,
+            "per_keyword_status": [],
+            "expected_keywords_list": []
+        })
+    return results
@@ -0,0 +1,141 @@
+import sys
+sys.dont_write_bytecode = True
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+import config
+from config import SCORE_THRESHOLD
+from judge import semantic
+from utils.disk_cache import DiskCache
+
+VERDICT_CACHE_ENABLED = getattr(config, "VERDICT_CACHE_ENABLED", True)
+# Verdicts kept in memory (least recently used dropped first)
+VERDICT_CACHE_SIZE = getattr(config, "VERDICT_CACHE_SIZE", 50000)
+# SQLite file that keeps verdicts between runs; None keeps them in memory only
+VERDICT_CACHE_PATH = getattr(config, "VERDICT_CACHE_PATH", None)
+VERDICT_CACHE_MAX_MB = getattr(config, "VERDICT_CACHE_MAX_MB", 100)
+
+# Everything that decides a verdict: matching, stemmer, synonym table, scoring
+_JUDGE_SOURCES = ("llm_judge.py", "aho_corasick.py", "batch_judge.py", "semantic.py")
+
+
+def _judge_version():
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in _JUDGE_SOURCES:
+        with open(os.path.join(directory, name), "rb") as f:
+            digest.update(name.encode("utf-8") + b"\0" + f.read())
+    return digest.hexdigest()[:16]
+
+
+# Changes whenever a judge source file does, so verdicts from an older judge are never served
+JUDGE_VERSION = _judge_version()
+
+_lock = threading.Lock()
+_memory = OrderedDict()
+_disk = None
+_enabled = VERDICT_CACHE_ENABLED
+_hits = 0
+_misses = 0
+
+
+@lru_cache(maxsize=1)
+def _semantic_fingerprint():
+    # The IDF table comes from the test suite files, which can change without the code changing
+    return hashlib.sha256(semantic._idf().tobytes()).hexdigest()[:16]
+
+
+def make_key(llm_answer, expected_valid, expected_invalid, mode):
+    """
+    Content hash of everything that determines a verdict, or None if the
+    inputs are not plain text (such verdicts are not cached).
+    """
+    texts = (llm_answer, expected_valid, expected_invalid or None)
+    if not all(text is None or isinstance(text, str) for text in texts):
+        return None
+    if mode == 'semantic':
+        settings = {"threshold": semantic.SEMANTIC_THRESHOLD, "idf": _semantic_fingerprint()}
+    else:
+        settings = {"threshold": SCORE_THRESHOLD, "use_simple": mode == 'simple'}
+    material = json.dumps(
+        {"version": JUDGE_VERSION, "mode": mode, "settings": settings, "texts": texts},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def set_enabled(enabled):
+    """Turn the cache on or off for this process."""
+    global _enabled
+    _enabled = enabled
+
+
+def _get_disk():
+    global _disk
+    if _disk is None and VERDICT_CACHE_PATH:
+        path = VERDICT_CACHE_PATH
+        if not os.path.isabs(path):
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            path = os.path.join(project_root, path)
+        _disk = DiskCache(path, max_bytes=VERDICT_CACHE_MAX_MB * 1024 * 1024)
+    return _disk
+
+
+def get(key):
+    """Return a copy of the cached verdict dict for key, or None."""
+    global _hits, _misses
+    if not _enabled or key is None:
+        return None
+    with _lock:
+        value = _memory.get(key)
+        if value is not None:
+            _memory.move_to_end(key)
+        else:
+            disk = _get_disk()
+            value = disk.get(key) if disk is not None else None
+            if value is not None:
+                _remember(key, value)
+        if value is None:
+            _misses += 1
+            return None
+        _hits += 1
+    # Stored as JSON, so every caller gets its own lists
+    return json.loads(value)
+
+
+def put(key, verdict):
+    """Remember a verdict dict."""
+    if not _enabled or key is None:
+        return
+    value = json.dumps(verdict, ensure_ascii=False)
+    with _lock:
+        _remember(key, value)
+        disk = _get_disk()
+        if disk is not None:
+            disk.set(key, value)
+
+
+def _remember(key, value):
+    _memory[key] = value
+    _memory.move_to_end(key)
+    while len(_memory) > VERDICT_CACHE_SIZE:
+        _memory.popitem(last=False)
+
+
+def clear():
+    """Forget every verdict, in memory and on disk."""
+    global _hits, _misses
+    with _lock:
+        _memory.clear()
+        disk = _get_disk()
+        if disk is not None:
+            disk.clear()
+        _hits = _misses = 0
+
+
+def stats():
+    with _lock:
+        return {"hits": _hits, "misses": _misses, "entries": len(_memory)}
@@ -3,153 +3,515 @@ import os
 sys.dont_write_bytecode = True
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+import config
 from config import AIRLINE_CSV, VISA_CSV, MAX_TESTS, SCORE_THRESHOLD, VALIDATION_MODE, RESPONSE_PREVIEW_LENGTH
-from bots.chatgpt_client import ask_chatgpt
-from bots.deepseek_client import ask_deepseek
-from judge.llm_judge import judge_llm_response
+from bots import async_pool, batch, deadline, http_pool, rate_limiter, registry, resilience, response_cache, single_flight
+from bots.fanout import ask_all, ask_all_async, ask_all_stream
+from bots.prompt_builder import PROMPT_FIELDS
+from judge import parallel, verdict_cache
+from judge.llm_judge import judge_llm_response, get_judge_plan, StreamingCoverage
 from utils.csv_loader import load_testcases
+from utils.text_cleaner import clean_text
 from utils.excel_writer import save_results, save_summary
+from utils.pipeline import Pipeline, Stage
 
+WORKERS = getattr(config, "WORKERS", 1)
+USE_ASYNC = getattr(config, "USE_ASYNC", False)
+STREAMING = getattr(config, "STREAMING", False)
+EARLY_STOP = getattr(config, "EARLY_STOP", False)
+BATCH_DIR = getattr(config, "BATCH_DIR", "output/batch")
+PIPELINE = getattr(config, "PIPELINE", False)
+PIPELINE_QUEUE_SIZE = getattr(config, "PIPELINE_QUEUE_SIZE", 16)
+# Worker threads per pipeline stage; "dispatch" defaults to --workers, the rest to 1
+PIPELINE_WORKERS = getattr(config, "PIPELINE_WORKERS", {})
 
-def run_testset(name, path):
-    tests = load_testcases(path)
-    results = []
+TEST_SETS = (("airline_policy", AIRLINE_CSV), ("visa_guidance", VISA_CSV))
 
-    for idx, test_case in enumerate(tests, start=1):
-        if idx > MAX_TESTS:
-            break
 
-        print(f"[{idx}/{MAX_TESTS}] {test_case['question'][:50]}...")
+def _format_seconds(value):
+    return f"{value:.2f}s" if value is not None else "n/a"
 
-        question = test_case.get("question", "")
-        input_1 = test_case.get("input_1", "")
-        input_2 = test_case.get("input_2", "")
-        input_3 = test_case.get("input_3", "")
-        context_1 = test_case.get("context_1", "")
-        context_2 = test_case.get("context_2", "")
-        context_3 = test_case.get("context_3", "")
-        expected_valid = test_case.get("expected_valid", "")
-        expected_invalid = test_case.get("expected_invalid", "")
 
-        try:
-            chatgpt_answer = ask_chatgpt(
-                question=question, input_1=input_1, input_2=input_2, input_3=input_3,
-                context_1=context_1, context_2=context_2, context_3=context_3,
-                test_set_type=name
-            )
-        except Exception as e:
-            chatgpt_answer = f"[ChatGPT Error] {str(e)}"
+def _summarise_judge(judge):
+    return {
+        "score": judge.get("score", 0.0),
+        "validity": judge.get("validity", "Unknown"),
+        "validity_reason": judge.get("validity_reason", ""),
+        "per_keyword": judge.get("per_keyword_status", []),
+        "expected_keywords": judge.get("expected_keywords_list", []),
+    }
 
-        try:
-            deepseek_answer = ask_deepseek(
-                question=question, input_1=input_1, input_2=input_2, input_3=input_3,
-                context_1=context_1, context_2=context_2, context_3=context_3,
-                test_set_type=name
-            )
-        except Exception as e:
-            deepseek_answer = f"[DeepSeek Error] {str(e)}"
 
+def _judge_answer(question, answer, expected_valid, expected_invalid, use_simple, plan=None):
+    try:
+        return _summarise_judge(judge_llm_response(
+            question=question, llm_answer=answer,
+            expected_valid=expected_valid, expected_invalid=expected_invalid,
+            use_simple=use_simple, plan=plan, mode=VALIDATION_MODE
+        ))
+    except Exception as e:
+        return {
+            "score": 0.0,
+            "validity": f"[Error] {str(e)}",
+            "validity_reason": f"[Error] {str(e)}",
+            "per_keyword": [],
+            "expected_keywords": [],
+        }
+
+
+def judge_rows(rows, providers, processes=1, clean=None):
+    """
+    Judge many cases' answers in one pass (judge_many(), optionally in worker processes).
+
+    Args:
+        rows: List of (test_case, answers) with answers a dict of provider name -> answer
+        processes: Judge in this many worker processes (see judge.parallel)
+        clean: One dict of provider name -> bool per row, marking answers to
+            run through clean_text() first; the cleaned text replaces the
+            raw answer in `rows`
+
+    Returns:
+        One dict of provider name -> judge summary per row, or None if the
+        batch could not be judged (run_case then judges answer by answer)
+    """
+    answers = [row_answers[p.name] for _, row_answers in rows for p in providers]
+    expected = [test_case.get("expected_valid", "") for test_case, _ in rows for _ in providers]
+    if clean:
+        clean = [row_clean[p.name] for row_clean in clean for p in providers]
+    try:
+        answers, verdicts = parallel.judge_parallel(answers, expected, VALIDATION_MODE, clean=clean, processes=processes)
+    except Exception:
+        return None
+    if clean:
+        cleaned = iter(answers)
+        for _, row_answers in rows:
+            for p in providers:
+                row_answers[p.name] = next(cleaned)
+    summaries = iter(_summarise_judge(verdict) for verdict in verdicts)
+    return [{p.name: next(summaries) for p in providers} for _ in rows]
+
+
+def _early_stop_applies(early_stop):
+    # The coverage check only guarantees an unchanged verdict for the keyword
+    # judges; a cut-off answer scores differently in semantic mode
+    return early_stop and VALIDATION_MODE != 'semantic'
+
+
+def run_case(name, idx, test_case, providers=None, answers=None, streaming=STREAMING, early_stop=EARLY_STOP,
+             judged=None):
+    """
+    Ask every provider one test case and judge their answers.
+
+    If `answers` is given as a dict of provider name -> answer, the providers
+    are not called again and only the judge step runs; `judged` may also
+    hold those answers' verdicts from judge_rows(). With streaming=True
+    time-to-first-token is recorded, and early_stop=True ends each stream
+    once every expected keyword has appeared (ignored in semantic mode).
+
+    Returns:
+        Tuple of (result dict, list of console lines for this case)
+    """
+    if providers is None:
+        providers = registry.get_providers()
+    output = []
+    prompt_kwargs = {field: test_case.get(field, "") for field in PROMPT_FIELDS}
+    question = prompt_kwargs["question"]
+    expected_valid = test_case.get("expected_valid", "")
+    expected_invalid = test_case.get("expected_invalid", "")
+    # Keywords, stems and patterns of expected_valid, shared by every provider's judge
+    plan = get_judge_plan(expected_valid if isinstance(expected_valid, str) else None)
+
+    timings = None
+    if answers is None and streaming:
+        make_stop_check = None
+        if _early_stop_applies(early_stop):
+            make_stop_check = lambda: StreamingCoverage(expected_valid, plan=plan)
+        timings = ask_all_stream(providers, test_set_type=name, make_stop_check=make_stop_check, **prompt_kwargs)
+        answers = {provider: timing["answer"] for provider, timing in timings.items()}
+    elif answers is None:
+        answers = ask_all(providers, test_set_type=name, **prompt_kwargs)
+
+    if judged is None:
+        judged = (judge_rows([(test_case, answers)], providers) or [None])[0]
+    if judged is None:
+        # One answer broke the batch judge; judge each alone so only it reports the error
         use_simple = (VALIDATION_MODE == 'simple')
-        
-        try:
-            chatgpt_judge = judge_llm_response(
-                question=question, llm_answer=chatgpt_answer,
-                expected_valid=expected_valid, expected_invalid=expected_invalid,
-                use_simple=use_simple
-            )
-            chatgpt_score = chatgpt_judge.get("score", 0.0)
-            chatgpt_validity = chatgpt_judge.get("validity", "Unknown")
-            chatgpt_validity_reason = chatgpt_judge.get("validity_reason", "")
-            chatgpt_per_keyword = chatgpt_judge.get("per_keyword_status", [])
-            chatgpt_expected_keywords = chatgpt_judge.get("expected_keywords_list", [])
-        except Exception as e:
-            chatgpt_score = 0.0
-            chatgpt_validity = f"[Error] {str(e)}"
-            chatgpt_validity_reason = f"[Error] {str(e)}"
-            chatgpt_per_keyword = []
-            chatgpt_expected_keywords = []
+        judged = {
+            p.name: _judge_answer(question, answers[p.name], expected_valid, expected_invalid, use_simple, plan)
+            for p in providers
+        }
+    # Keywords come from expected_valid, so they are the same for every provider
+    expected_keywords = next((j["expected_keywords"] for j in judged.values() if j["expected_keywords"]), [])
 
-        try:
-            deepseek_judge = judge_llm_response(
-                question=question, llm_answer=deepseek_answer,
-                expected_valid=expected_valid, expected_invalid=expected_invalid,
-                use_simple=use_simple
+    output.append("  " + " | ".join(
+        f"{p.label}: {'✓' if judged[p.name]['validity'] == 'Valid' else '✗'} {judged[p.name]['score']:.1f}%"
+        for p in providers
+    ))
+    if timings:
+        output.append("  TTFT: " + ", ".join(
+            f"{p.short_label}={_format_seconds(timings[p.name]['ttft'])} "
+            f"(total {_format_seconds(timings[p.name]['total_time'])}"
+            f"{', stopped early' if timings[p.name]['stopped_early'] else ''})"
+            for p in providers
+        ))
+    
+    # Print detailed analysis (like sample group's AnalysisString)
+    if expected_keywords and any(j["per_keyword"] for j in judged.values()):
+        output.append(f"\n  Expected Outputs:")
+        for i, keyword in enumerate(expected_keywords):
+            matches = ", ".join(
+                f"{p.short_label}={'True' if i < len(judged[p.name]['per_keyword']) and judged[p.name]['per_keyword'][i] else 'False'}"
+                for p in providers
             )
-            deepseek_score = deepseek_judge.get("score", 0.0)
-            deepseek_validity = deepseek_judge.get("validity", "Unknown")
-            deepseek_validity_reason = deepseek_judge.get("validity_reason", "")
-            deepseek_per_keyword = deepseek_judge.get("per_keyword_status", [])
-            deepseek_expected_keywords = deepseek_judge.get("expected_keywords_list", [])
-        except Exception as e:
-            deepseek_score = 0.0
-            deepseek_validity = f"[Error] {str(e)}"
-            deepseek_validity_reason = f"[Error] {str(e)}"
-            deepseek_per_keyword = []
-            deepseek_expected_keywords = []
-
-        gpt_status = "✓" if chatgpt_validity == "Valid" else "✗"
-        ds_status = "✓" if deepseek_validity == "Valid" else "✗"
-        print(f"  ChatGPT: {gpt_status} {chatgpt_score:.1f}% | DeepSeek: {ds_status} {deepseek_score:.1f}%")
+            output.append(f"    [{keyword}: {matches}]")
         
-        # Print detailed analysis (like sample group's AnalysisString)
-        if chatgpt_expected_keywords and (chatgpt_per_keyword or deepseek_per_keyword):
-            print(f"\n  Expected Outputs:")
-            for i, keyword in enumerate(chatgpt_expected_keywords):
-                gpt_match = "True" if i < len(chatgpt_per_keyword) and chatgpt_per_keyword[i] else "False"
-                ds_match = "True" if i < len(deepseek_per_keyword) and deepseek_per_keyword[i] else "False"
-                print(f"    [{keyword}: GPT={gpt_match}, DS={ds_match}]")
-            
-            chatgpt_matched = sum(1 for status in chatgpt_per_keyword if status) if chatgpt_per_keyword else 0
-            deepseek_matched = sum(1 for status in deepseek_per_keyword if status) if deepseek_per_keyword else 0
-            total = len(chatgpt_expected_keywords)
-            print(f"  Total Correct: GPT={chatgpt_matched}/{total} ({chatgpt_score:.1f}%), DS={deepseek_matched}/{total} ({deepseek_score:.1f}%)")
-            print(f"  Validity: GPT={chatgpt_validity} ({chatgpt_validity_reason})")
-            print(f"            DS={deepseek_validity} ({deepseek_validity_reason})")
+        total = len(expected_keywords)
+        output.append("  Total Correct: " + ", ".join(
+            f"{p.short_label}={sum(1 for status in judged[p.name]['per_keyword'] if status)}/{total} ({judged[p.name]['score']:.1f}%)"
+            for p in providers
+        ))
+        for i, p in enumerate(providers):
+            prefix = "  Validity: " if i == 0 else "            "
+            output.append(f"{prefix}{p.short_label}={judged[p.name]['validity']} ({judged[p.name]['validity_reason']})")
 
+    result = {
+        "test_number": idx,
+        "question": question,
+        "input_1": prompt_kwargs["input_1"],
+        "input_2": prompt_kwargs["input_2"],
+        "input_3": prompt_kwargs["input_3"],
+        "context_1": prompt_kwargs["context_1"],
+        "context_2": prompt_kwargs["context_2"],
+        "context_3": prompt_kwargs["context_3"],
+        "expected_valid": expected_valid,
+        "expected_keywords": expected_keywords
+    }
+    for p in providers:
+        answer = answers[p.name]
         # Truncate responses for preview (like sample group)
-        chatgpt_preview = chatgpt_answer[:RESPONSE_PREVIEW_LENGTH] if len(chatgpt_answer) > RESPONSE_PREVIEW_LENGTH else chatgpt_answer
-        deepseek_preview = deepseek_answer[:RESPONSE_PREVIEW_LENGTH] if len(deepseek_answer) > RESPONSE_PREVIEW_LENGTH else deepseek_answer
-        
-        results.append({
-            "test_number": idx,
-            "question": question,
-            "input_1": input_1,
-            "input_2": input_2,
-            "input_3": input_3,
-            "context_1": context_1,
-            "context_2": context_2,
-            "context_3": context_3,
-            "expected_valid": expected_valid,
-            "chatgpt_answer": chatgpt_answer,
-            "deepseek_answer": deepseek_answer,
-            "chatgpt_preview": chatgpt_preview,
-            "deepseek_preview": deepseek_preview,
-            "chatgpt_score": chatgpt_score,
-            "deepseek_score": deepseek_score,
-            "chatgpt_validity": chatgpt_validity,
-            "deepseek_validity": deepseek_validity,
-            "chatgpt_validity_reason": chatgpt_validity_reason,
-            "deepseek_validity_reason": deepseek_validity_reason,
-            "chatgpt_per_keyword": chatgpt_per_keyword,
-            "deepseek_per_keyword": deepseek_per_keyword,
-            "expected_keywords": chatgpt_expected_keywords  # Same for both, just use one
-        })
-
-    save_results(name, results)
+        result[f"{p.name}_answer"] = answer
+        result[f"{p.name}_preview"] = answer[:RESPONSE_PREVIEW_LENGTH] if len(answer) > RESPONSE_PREVIEW_LENGTH else answer
+        result[f"{p.name}_score"] = judged[p.name]["score"]
+        result[f"{p.name}_validity"] = judged[p.name]["validity"]
+        result[f"{p.name}_validity_reason"] = judged[p.name]["validity_reason"]
+        result[f"{p.name}_per_keyword"] = judged[p.name]["per_keyword"]
+    if timings:
+        for provider, timing in timings.items():
+            result[f"{provider}_ttft"] = timing["ttft"]
+            result[f"{provider}_total_time"] = timing["total_time"]
+            result[f"{provider}_stopped_early"] = timing["stopped_early"]
+
+    return result, output
+
+
+def _run_case_before_deadline(*args, **kwargs):
+    # Cases still queued when the deadline passes are not started
+    deadline.check()
+    return run_case(*args, **kwargs)
+
+
+def _report_case(done, total, result, output):
+    print(f"[{done}/{total}] #{result['test_number']} {result['question'][:50]}...")
+    print("\n".join(output))
+
+
+def _pipeline_stages(name, providers, workers):
+    """
+    run_case split into stages: build the prompt fields, ask the providers,
+    clean the answers, judge them, then build the result and console lines.
+    """
+    def prompt(item):
+        idx, test_case = item
+        return {"idx": idx, "test_case": test_case,
+                "prompt_kwargs": {field: test_case.get(field, "") for field in PROMPT_FIELDS}}
+
+    def dispatch(case):
+        # Cases still queued when the deadline passes are not started
+        deadline.check()
+        case["answers"] = ask_all(providers, test_set_type=name, clean=False, **case["prompt_kwargs"])
+        return case
+
+    def clean(case):
+        answers = case["answers"]
+        case["answers"] = {
+            p.name: answers[p.name] if p.is_error(answers[p.name]) else clean_text(answers[p.name])
+            for p in providers
+        }
+        return case
+
+    def judge(case):
+        case["judged"] = (judge_rows([(case["test_case"], case["answers"])], providers) or [None])[0]
+        return case
+
+    def report(case):
+        return run_case(name, case["idx"], case["test_case"], providers,
+                        answers=case["answers"], judged=case["judged"])
+
+    stage_workers = dict({"dispatch": workers}, **PIPELINE_WORKERS)
+    return [
+        Stage(stage_name, fn, workers=stage_workers.get(stage_name, 1))
+        for stage_name, fn in (("prompt", prompt), ("dispatch", dispatch), ("clean", clean),
+                               ("judge", judge), ("report", report))
+    ]
+
+
+def _print_pipeline_stats(stats):
+    print("\nPipeline stages:")
+    for stage_name, stage in stats.items():
+        print(f"  {stage_name}: {stage['workers']} worker(s), {stage['processed']} case(s), "
+              f"busy {stage['busy_time']:.2f}s, queue depth max {stage['max_queue_depth']}")
+
+
+def run_testset(name, path, workers=WORKERS, use_async=USE_ASYNC, streaming=STREAMING, early_stop=EARLY_STOP,
+                providers=None, pipeline=PIPELINE):
+    """
+    Run a test set against every provider (default: all in PROVIDERS),
+    keeping up to `workers` test cases in flight at once.
+
+    With use_async=True the provider calls run as coroutines on the shared
+    event loop instead of one thread per case. With pipeline=True fetching,
+    cleaning and judging run as separate stages connected by bounded
+    queues, so judging one case overlaps with fetching the next. Streaming
+    runs always use worker threads.
+
+    Cases are printed as they finish; results are saved in CSV order. If
+    the run deadline (see bots.deadline) passes, no further cases start,
+    unfinished ones are cancelled and the completed ones are still saved.
+    """
+    if providers is None:
+        providers = registry.get_providers()
+    tests = load_testcases(path, limit=MAX_TESTS)
+    total = len(tests)
+    results = []
+
+    if use_async and not streaming:
+        fetches = async_pool.submit_bounded([
+            ask_all_async(providers, test_set_type=name, **{field: test_case.get(field, "") for field in PROMPT_FIELDS})
+            for test_case in tests
+        ], workers)
+        cases = {fetch: (idx, test_case) for idx, (fetch, test_case) in enumerate(zip(fetches, tests), start=1)}
+        try:
+            # Judge each case here as soon as its answers arrive
+            for fetch in as_completed(fetches, timeout=deadline.remaining()):
+                idx, test_case = cases[fetch]
+                try:
+                    answers = fetch.result()
+                except deadline.DeadlineExceeded:
+                    continue
+                result, output = run_case(name, idx, test_case, providers, answers=answers)
+                results.append(result)
+                _report_case(len(results), total, result, output)
+        except FuturesTimeoutError:
+            pass
+        finally:
+            # Cancels the coroutines of cases still waiting or in flight
+            for fetch in fetches:
+                fetch.cancel()
+    elif pipeline and not streaming:
+        flow = Pipeline(_pipeline_stages(name, providers, workers), queue_size=PIPELINE_QUEUE_SIZE,
+                        drop=(deadline.DeadlineExceeded,))
+        for result, output in flow.run(enumerate(tests, start=1), timeout=deadline.remaining()):
+            results.append(result)
+            _report_case(len(results), total, result, output)
+        _print_pipeline_stats(flow.stats())
+    else:
+        pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        futures = [
+            pool.submit(_run_case_before_deadline, name, idx, test_case, providers,
+                        streaming=streaming, early_stop=early_stop)
+            for idx, test_case in enumerate(tests, start=1)
+        ]
+        try:
+            for future in as_completed(futures, timeout=deadline.remaining()):
+                try:
+                    result, output = future.result()
+                except deadline.DeadlineExceeded:
+                    continue
+                results.append(result)
+                _report_case(len(results), total, result, output)
+        except FuturesTimeoutError:
+            pass
+        finally:
+            # Past the deadline, drop queued cases and don't wait for running ones;
+            # their socket timeouts are clamped to the deadline so they end shortly
+            pool.shutdown(wait=not deadline.expired(), cancel_futures=True)
+
+    if len(results) < total:
+        print(f"\nRun deadline reached: {total - len(results)} of {total} case(s) not completed")
+
+    results.sort(key=lambda r: r["test_number"])
+
+    save_results(name, results, registry.columns(providers))
     print(f"\nSaved: output/{name}.xlsx")
     
     return results
 
 
+def prepare_batch(providers, directory=BATCH_DIR):
+    """
+    Write one batch manifest per provider covering every test set.
+
+    No provider is called; submit the files to the provider's batch API and
+    pass the downloaded output files to ingest_batch().
+
+    Returns:
+        List of (manifest path, number of requests)
+    """
+    if not os.path.isabs(directory):
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        directory = os.path.join(project_root, directory)
+
+    test_sets = [(name, load_testcases(path, limit=MAX_TESTS)) for name, path in TEST_SETS]
+    manifests = []
+    for provider in providers:
+        path = os.path.join(directory, f"{provider.name}.jsonl")
+        count = batch.write_manifest(path, (
+            batch.build_request(provider, name, idx, test_case)
+            for name, tests in test_sets
+            for idx, test_case in enumerate(tests, start=1)
+        ))
+        manifests.append((path, count))
+    return manifests
+
+
+def ingest_batch(name, path, batch_results, providers, judge_processes=parallel.JUDGE_PROCESSES):
+    """
+    Judge and save a test set from completed batch results instead of live calls.
+
+    Args:
+        batch_results: Output of batch.read_results()
+        judge_processes: Worker processes that clean and judge the answers
+            (0 = one per CPU, 1 = this process)
+    """
+    tests = load_testcases(path, limit=MAX_TESTS)
+    rows = [
+        (test_case, {p.name: batch.answer_for(batch_results, name, idx, p, clean=False) for p in providers})
+        for idx, test_case in enumerate(tests, start=1)
+    ]
+    # Raw answers still need cleaning; provider error strings are kept as they are
+    to_clean = [
+        {p.name: batch.has_answer(batch_results, name, idx, p) for p in providers}
+        for idx in range(1, len(tests) + 1)
+    ]
+    # Every stored answer is cleaned and scored in one pass
+    judged_rows = judge_rows(rows, providers, processes=judge_processes, clean=to_clean)
+    if judged_rows is None:
+        for (_, answers), row_clean in zip(rows, to_clean):
+            for p in providers:
+                if row_clean[p.name]:
+                    answers[p.name] = clean_text(answers[p.name])
+        judged_rows = [None] * len(rows)
+    results = []
+    for idx, ((test_case, answers), judged) in enumerate(zip(rows, judged_rows), start=1):
+        result, output = run_case(name, idx, test_case, providers, answers=answers, judged=judged)
+        _report_case(idx, len(tests), result, output)
+        results.append(result)
+
+    save_results(name, results, registry.columns(providers))
+    print(f"\nSaved: output/{name}.xlsx")
+
+    return results
+
+
+def _print_verdict_cache_stats():
+    # Counts this process only; judge worker processes keep their own
+    verdicts = verdict_cache.stats()
+    if verdicts["hits"]:
+        print(f"Verdict cache: {verdicts['hits']} hits, {verdicts['misses']} misses (judge {verdict_cache.JUDGE_VERSION})")
+
+
 def main():
-    print(f"\nAI Test Verification Tool (Max: {MAX_TESTS}, Threshold: {SCORE_THRESHOLD}%)\n")
+    parser = argparse.ArgumentParser(description="AI Test Verification Tool")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help=f"Number of test cases to run in parallel (default: {WORKERS})")
+    parser.add_argument("--async", dest="use_async", action="store_true", default=USE_ASYNC,
+                        help="Use the asyncio provider clients instead of worker threads")
+    parser.add_argument("--stream", action="store_true", default=STREAMING,
+                        help="Stream answers and record time-to-first-token")
+    parser.add_argument("--pipeline", action="store_true", default=PIPELINE,
+                        help="Fetch, clean and judge in separate pipelined stages so CPU and network work overlap")
+    parser.add_argument("--early-stop", action="store_true", default=EARLY_STOP,
+                        help="With --stream, stop generation once every expected keyword has appeared "
+                             "(keyword modes only; ignored when VALIDATION_MODE is semantic)")
+    parser.add_argument("--deadline", type=float, default=deadline.RUN_DEADLINE, metavar="SECONDS",
+                        help="Wall-clock budget for the whole run; unfinished cases are cancelled and partial results saved")
+    parser.add_argument("--providers",
+                        help="Comma-separated provider names to benchmark (default: every provider in PROVIDERS)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the on-disk response cache and always call the providers")
+    parser.add_argument("--batch-prepare", action="store_true",
+                        help="Only write per-provider batch manifests (JSONL) to --batch-dir; no API calls")
+    parser.add_argument("--batch-dir", default=BATCH_DIR,
+                        help=f"Directory for batch manifests (default: {BATCH_DIR})")
+    parser.add_argument("--batch-ingest", nargs="+", metavar="FILE",
+                        help="Judge completed batch output files instead of calling the providers")
+    parser.add_argument("--judge-processes", type=int, default=parallel.JUDGE_PROCESSES, metavar="N",
+                        help="With --batch-ingest, clean and judge answers in N worker processes (0 = one per CPU)")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        response_cache.set_enabled(False)
+    if args.early_stop and not _early_stop_applies(args.early_stop):
+        print("Warning: --early-stop is ignored in semantic mode (a cut-off answer would score differently)")
+        args.early_stop = False
+
+    providers = registry.get_providers(args.providers.split(",") if args.providers else None)
+
+    print(f"\nAI Test Verification Tool (Max: {MAX_TESTS}, Threshold: {SCORE_THRESHOLD}%, Workers: {args.workers})")
+    print(f"Providers: {', '.join(p.label for p in providers)}\n")
+
+    if args.batch_prepare:
+        for path, count in prepare_batch(providers, args.batch_dir):
+            print(f"Wrote {count} request(s) to {path}")
+        print("\nDone\n")
+        return
+
+    if args.batch_ingest:
+        batch_results = batch.read_results(args.batch_ingest)
+        airline_results = ingest_batch("airline_policy", AIRLINE_CSV, batch_results, providers, args.judge_processes)
+        visa_results = ingest_batch("visa_guidance", VISA_CSV, batch_results, providers, args.judge_processes)
+        parallel.close()
+        _print_verdict_cache_stats()
+        save_summary(airline_results, visa_results, registry.columns(providers))
+        print(f"Saved: output/test_summary.xlsx")
+        print("\nDone\n")
+        return
 
     # Run tests and collect results
-    airline_results = run_testset("airline_policy", AIRLINE_CSV)
-    visa_results = run_testset("visa_guidance", VISA_CSV)
+    deadline.start(args.deadline)
+    run_options = {"workers": args.workers, "use_async": args.use_async,
+                   "streaming": args.stream, "early_stop": args.early_stop, "providers": providers,
+                   "pipeline": args.pipeline}
+    airline_results = run_testset("airline_policy", AIRLINE_CSV, **run_options)
+    visa_results = run_testset("visa_guidance", VISA_CSV, **run_options)
+    async_pool.close()
+
+    # Few connections for many requests means keep-alive is skipping handshakes
+    for session, names in registry.sessions(providers).items():
+        stats = http_pool.pool_stats(session)
+        if stats["requests"]:
+            print(f"{', '.join(names)}: {stats['requests']} requests over {stats['connections']} connection(s)")
+
+    for provider, limits in rate_limiter.stats().items():
+        if limits["throttled"]:
+            print(f"{provider}: throttled {limits['throttled']} time(s), settled at {limits['concurrency']} concurrent call(s)")
+
+    for provider, circuit in resilience.stats().items():
+        if circuit["rejected"]:
+            print(f"{provider}: circuit breaker skipped {circuit['rejected']} call(s)")
+
+    for provider, coalesced in single_flight.stats().items():
+        if coalesced:
+            print(f"{provider}: {coalesced} duplicate in-flight call(s) coalesced")
+
+    cache_stats = response_cache.stats()
+    print(f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+    _print_verdict_cache_stats()
     
     # Create summary file
-    save_summary(airline_results, visa_results)
+    save_summary(airline_results, visa_results, registry.columns(providers))
     print(f"Saved: output/test_summary.xlsx")
     
     print("\nDone\n")
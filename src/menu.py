@@ -5,6 +5,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import MAX_TESTS, SCORE_THRESHOLD, AIRLINE_CSV, VISA_CSV
 from main import run_testset
+from bots import registry
 from utils.excel_writer import save_summary
 
 
@@ -46,7 +47,7 @@ def run_both():
         visa_results = run_testset("visa_guidance", VISA_CSV)
         
         # Create summary file
-        save_summary(airline_results, visa_results)
+        save_summary(airline_results, visa_results, registry.columns(registry.get_providers()))
         print(f"Saved: output/test_summary.xlsx")
         
         print("\n✓ All tests completed")
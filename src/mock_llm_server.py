@@ -0,0 +1,291 @@
+import sys
+import os
+sys.dont_write_bytecode = True
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Local stand-in for the OpenAI / DeepSeek chat completions API.
+#
+# Point the clients at it with OPENAI_BASE_URL=http://127.0.0.1:8000/v1 and
+# DEEPSEEK_BASE_URL=http://127.0.0.1:8000 (environment or config.py) to
+# load-test concurrency, retries and the judge without network or API costs:
+#
+#   python src/mock_llm_server.py --latency lognormal:-0.5,0.4 --rate-limit-rate 0.05 --answer echo
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_ANSWER = (
+    "Based on the information provided, this depends on the airline's policy and "
+    "the traveller's circumstances. Please check the official website for details."
+)
+
+
+def parse_latency(spec):
+    """
+    Turn a latency spec into a function returning a delay in seconds.
+
+    Supported specs: "fixed:S", "uniform:LOW,HIGH", "normal:MEAN,STD",
+    "lognormal:MU,SIGMA" (of the underlying normal) and "exp:MEAN".
+    """
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(v) for v in args.split(",")] if args else []
+    except ValueError:
+        raise ValueError(f"Invalid latency spec '{spec}'")
+
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal" and len(values) == 2:
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal" and len(values) == 2:
+        return lambda: random.lognormvariate(values[0], values[1])
+    if kind == "exp" and len(values) == 1:
+        return lambda: random.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0
+    raise ValueError(f"Invalid latency spec '{spec}'")
+
+
+def load_answers(path):
+    """Read canned answers from a JSON list or a text file with one answer per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if path.endswith(".json"):
+        answers = json.loads(content)
+    else:
+        answers = [line.strip() for line in content.splitlines() if line.strip()]
+    if not answers:
+        raise ValueError(f"No answers found in '{path}'")
+    return answers
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so client connection pooling can be measured
+
+    def log_message(self, format, *args):
+        if self.server.settings["verbose"]:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message, error_type, code=None, headers=None):
+        self._send_json(status, {"error": {"message": message, "type": error_type, "code": code}}, headers)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/stats", "/v1/stats"):
+            self._send_json(200, self.server.stats())
+        elif self.path.rstrip("/") in ("/models", "/v1/models"):
+            self._send_json(200, {"object": "list", "data": []})
+        else:
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw_body = self.rfile.read(length)
+
+        if self.path.rstrip("/") not in ("/chat/completions", "/v1/chat/completions"):
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error")
+            return
+        try:
+            body = json.loads(raw_body)
+            messages = body["messages"]
+            prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self._send_error(400, "Request body must be JSON with a messages list", "invalid_request_error")
+            return
+
+        settings = self.server.settings
+        self.server.count("requests")
+        time.sleep(settings["latency"]())
+
+        roll = random.random()
+        if roll < settings["rate_limit_rate"]:
+            self.server.count("rate_limited")
+            self._send_error(429, "Rate limit reached for requests (mock)", "requests", "rate_limit_exceeded",
+                             headers={"Retry-After": str(settings["retry_after"])})
+            return
+        if roll < settings["rate_limit_rate"] + settings["error_rate"]:
+            self.server.count("errors")
+            self._send_error(settings["error_status"], "The server is overloaded (mock)", "server_error")
+            return
+
+        answer = self.server.answer_for(prompt)
+        model = body.get("model", "mock-model")
+        created = int(time.time())
+        completion_id = f"chatcmpl-mock-{self.server.count('completions')}"
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(answer) // 4)
+
+        if body.get("stream"):
+            self._stream(answer, model, created, completion_id)
+            return
+
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        })
+
+    def _stream(self, answer, model, created, completion_id):
+        """Send the answer as server-sent events, a few words per chunk."""
+        settings = self.server.settings
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(delta, finish_reason=None):
+            payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                       "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+        words = answer.split(" ")
+        size = settings["chunk_words"]
+        try:
+            self._write_chunk(event({"role": "assistant"}))
+            for i in range(0, len(words), size):
+                text = " ".join(words[i:i + size])
+                if i + size < len(words):
+                    text += " "
+                time.sleep(settings["chunk_delay"])
+                self._write_chunk(event({"content": text}))
+            self._write_chunk(event({}, "stop"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading early (e.g. early stop); nothing to clean up
+            self.server.count("cancelled_streams")
+            self.close_connection = True
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, settings):
+        super().__init__(address, MockLLMHandler)
+        self.settings = settings
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+            return self._counters[name]
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def handle_error(self, request, client_address):
+        # Clients that time out or are cancelled hang up mid-response; that is expected here
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            self.count("client_disconnects")
+            return
+        super().handle_error(request, client_address)
+
+    def answer_for(self, prompt):
+        settings = self.settings
+        if settings["answer"] == "echo":
+            return prompt
+        answers = settings["answers"]
+        # Same prompt -> same canned answer, so repeated runs are comparable
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        return answers[int.from_bytes(digest[:4], "big") % len(answers)]
+
+
+def make_server(host="127.0.0.1", port=8000, latency="fixed:0.2", error_rate=0.0, error_status=503,
+                rate_limit_rate=0.0, retry_after=1.0, answer="canned", answers=None,
+                chunk_words=3, chunk_delay=0.02, verbose=False):
+    """
+    Create (but do not start) a mock server; call serve_forever() on it.
+
+    Args:
+        latency: Spec for the delay before each response (see parse_latency)
+        error_rate: Fraction of requests answered with error_status
+        rate_limit_rate: Fraction of requests answered with HTTP 429
+        retry_after: Retry-After seconds sent with each 429
+        answer: "canned" (from `answers`) or "echo" (the prompt itself)
+        answers: List of canned answers; defaults to one generic answer
+        chunk_words / chunk_delay: Streaming chunk size and pause between chunks
+    """
+    if not 0 <= error_rate + rate_limit_rate <= 1:
+        raise ValueError("error_rate + rate_limit_rate must be between 0 and 1")
+    if answer not in ("canned", "echo"):
+        raise ValueError(f"Unknown answer mode '{answer}' (expected 'canned' or 'echo')")
+
+    settings = {
+        "latency": parse_latency(latency) if isinstance(latency, str) else latency,
+        "error_rate": error_rate,
+        "error_status": error_status,
+        "rate_limit_rate": rate_limit_rate,
+        "retry_after": retry_after,
+        "answer": answer,
+        "answers": answers or [DEFAULT_ANSWER],
+        "chunk_words": max(1, chunk_words),
+        "chunk_delay": chunk_delay,
+        "verbose": verbose,
+    }
+    return MockLLMServer((host, port), settings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="fixed:0.2",
+                        help="fixed:S, uniform:LOW,HIGH, normal:MEAN,STD, lognormal:MU,SIGMA or exp:MEAN (default: fixed:0.2)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status for injected errors (default: 503)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--answer", choices=("canned", "echo"), default="canned",
+                        help="Reply with canned answers or echo the prompt back")
+    parser.add_argument("--answers-file", help="Canned answers: JSON list or one answer per line")
+    parser.add_argument("--chunk-words", type=int, default=3, help="Words per streamed chunk")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="Seconds between streamed chunks")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = make_server(
+        host=args.host, port=args.port, latency=args.latency,
+        error_rate=args.error_rate, error_status=args.error_status,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after,
+        answer=args.answer, answers=load_answers(args.answers_file) if args.answers_file else None,
+        chunk_words=args.chunk_words, chunk_delay=args.chunk_delay, verbose=args.verbose
+    )
+    print(f"Mock LLM server on http://{args.host}:{args.port}")
+    print(f"  OPENAI_BASE_URL=http://{args.host}:{args.port}/v1  DEEPSEEK_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nStats: {json.dumps(server.stats())}")
+
+
+if __name__ == "__main__":
+    main()
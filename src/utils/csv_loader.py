@@ -2,31 +2,53 @@ import sys
 sys.dont_write_bytecode = True
 import csv
 import os
+from itertools import islice
 
-def load_testcases(path):
-    testcases = []
-    
+FIELDS = ("question", "input_1", "input_2", "input_3", "context_1", "context_2", "context_3",
+          "expected_valid", "expected_invalid")
+
+
+def _resolve(path):
     if not os.path.isabs(path):
         project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
         path = os.path.join(project_root, path)
+    return path
+
 
-    with open(path, newline="", encoding="utf-8") as f:
+def _read_testcases(path):
+    with open(_resolve(path), newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f, delimiter="|")
 
         for row in reader:
-            testcase = {
-                "question": row.get("question", "").strip(),
-                "input_1": row.get("input_1", "").strip(),
-                "input_2": row.get("input_2", "").strip(),
-                "input_3": row.get("input_3", "").strip(),
-                "context_1": row.get("context_1", "").strip(),
-                "context_2": row.get("context_2", "").strip(),
-                "context_3": row.get("context_3", "").strip(),
-                "expected_valid": row.get("expected_valid", "").strip(),
-                "expected_invalid": row.get("expected_invalid", "").strip()
-            }
-            
+            testcase = {field: (row.get(field) or "").strip() for field in FIELDS}
+
             if testcase["question"]:
-                testcases.append(testcase)
+                yield testcase
+
+
+def iter_testcases(path, limit=None, offset=0):
+    """
+    Yield test cases from a pipe-delimited file one at a time.
+
+    Rows are read and parsed only as they are needed, and the file is
+    closed as soon as `limit` test cases have been yielded, so a short run
+    over a large file does not read the rest of it.
+
+    Args:
+        path: CSV file, absolute or relative to the project root
+        limit: Most test cases to yield (None = all)
+        offset: Test cases to skip first (rows without a question are not counted)
+
+    Returns:
+        Generator of test case dicts
+    """
+    testcases = _read_testcases(path)
+    try:
+        yield from islice(testcases, offset, None if limit is None else offset + limit)
+    finally:
+        testcases.close()
+
 
-    return testcases
+def load_testcases(path, limit=None, offset=0):
+    """List of the test cases in a file; see iter_testcases()."""
+    return list(iter_testcases(path, limit=limit, offset=offset))
@@ -0,0 +1,101 @@
+import sys
+sys.dont_write_bytecode = True
+import os
+import sqlite3
+import threading
+import time
+
+
+class DiskCache:
+    """
+    Small persistent key/value store backed by SQLite.
+
+    Entries are evicted least-recently-used first once the stored values
+    exceed max_bytes, and entries older than ttl seconds are treated as
+    missing (ttl=None keeps them forever). Safe to share across threads.
+    """
+
+    def __init__(self, path, max_bytes=100 * 1024 * 1024, ttl=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        row = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        self._total_bytes = row[0]
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._delete(key)
+                self.misses += 1
+                return None
+
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store value under key, evicting old entries if over max_bytes."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._delete(key)
+            self._db.execute(
+                "INSERT INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._total_bytes += size
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._total_bytes = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "bytes": self._total_bytes}
+
+    def _delete(self, key):
+        row = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._total_bytes -= row[0]
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for key, size in rows:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    return
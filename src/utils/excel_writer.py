@@ -2,9 +2,28 @@ import sys
 sys.dont_write_bytecode = True
 import openpyxl
 from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.utils import get_column_letter
 import os
 
-def save_results(name, results):
+# (result key prefix, column label) for each provider, in column order
+DEFAULT_PROVIDERS = [("chatgpt", "ChatGPT"), ("deepseek", "DeepSeek")]
+
+# The summary sheet has always spelled the DeepSeek row this way
+SUMMARY_LABELS = {"DeepSeek": "Deepseek"}
+
+
+def save_results(name, results, providers=None):
+    """
+    Write one test set's results, one answer column per provider.
+
+    providers is a list of (key, label) pairs; result dicts hold each
+    provider's fields under "<key>_answer", "<key>_score" and so on.
+    """
+    if providers is None:
+        providers = DEFAULT_PROVIDERS
+    # Providers fill columns B, C, D, ...
+    columns = [get_column_letter(2 + i) for i in range(len(providers))]
+    last_column = columns[-1] if len(columns) > 1 else 'C'
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
     output_dir = os.path.join(project_root, "output")
     try:
@@ -33,12 +52,7 @@ def save_results(name, results):
         context_2 = r.get("context_2", "")
         context_3 = r.get("context_3", "")
         expected_valid = r.get("expected_valid", "")
-        chatgpt_answer = r.get("chatgpt_answer", "")
-        deepseek_answer = r.get("deepseek_answer", "")
-        chatgpt_score = r.get("chatgpt_score", "")
-        deepseek_score = r.get("deepseek_score", "")
-        chatgpt_validity = r.get("chatgpt_validity", "")
-        deepseek_validity = r.get("deepseek_validity", "")
+        answers = [r.get(f"{key}_answer", "") for key, _ in providers]
         
         if name == "airline_policy":
             input_label_1 = "Emirates Policy Inquiry"
@@ -120,7 +134,7 @@ def save_results(name, results):
         ws[f'A{row}'] = "Text Input (Question to LLMs)"
         ws[f'A{row}'].font = header_font
         ws[f'A{row}'].fill = header_fill
-        ws.merge_cells(f'B{row}:C{row}')
+        ws.merge_cells(f'B{row}:{last_column}{row}')
         ws[f'B{row}'] = question
         ws[f'B{row}'].alignment = Alignment(wrap_text=True, vertical="top")
         row += 1
@@ -128,7 +142,7 @@ def save_results(name, results):
         ws[f'A{row}'] = "Expected Answer (Ground Truth)"
         ws[f'A{row}'].font = header_font
         ws[f'A{row}'].fill = header_fill
-        ws.merge_cells(f'B{row}:C{row}')
+        ws.merge_cells(f'B{row}:{last_column}{row}')
         ws[f'B{row}'] = expected_valid
         ws[f'B{row}'].alignment = Alignment(wrap_text=True, vertical="top")
         row += 1
@@ -136,100 +150,84 @@ def save_results(name, results):
         ws[f'A{row}'] = "Actual Output (AI Model Responses)"
         ws[f'A{row}'].font = header_font
         ws[f'A{row}'].fill = header_fill
-        ws[f'B{row}'] = "ChatGPT"
-        ws[f'B{row}'].font = header_font
-        ws[f'C{row}'] = "DeepSeek"
-        ws[f'C{row}'].font = header_font
+        for col, (_, label) in zip(columns, providers):
+            ws[f'{col}{row}'] = label
+            ws[f'{col}{row}'].font = header_font
         row += 1
         
         # Response preview (truncated, like sample group)
-        chatgpt_preview = r.get("chatgpt_preview", chatgpt_answer)
-        deepseek_preview = r.get("deepseek_preview", deepseek_answer)
+        previews = [r.get(f"{key}_preview", answer) for (key, _), answer in zip(providers, answers)]
         
         ws[f'A{row}'] = "Answer (Preview)"
-        preview_text_gpt = chatgpt_preview + ("..." if len(chatgpt_answer) > len(chatgpt_preview) else "")
-        preview_text_ds = deepseek_preview + ("..." if len(deepseek_answer) > len(deepseek_preview) else "")
-        ws[f'B{row}'] = preview_text_gpt
-        ws[f'B{row}'].alignment = Alignment(wrap_text=True, vertical="top")
-        ws[f'C{row}'] = preview_text_ds
-        ws[f'C{row}'].alignment = Alignment(wrap_text=True, vertical="top")
+        for col, answer, preview in zip(columns, answers, previews):
+            ws[f'{col}{row}'] = preview + ("..." if len(answer) > len(preview) else "")
+            ws[f'{col}{row}'].alignment = Alignment(wrap_text=True, vertical="top")
         row += 1
         
         # Full answer (if different from preview)
-        if len(chatgpt_answer) > len(chatgpt_preview) or len(deepseek_answer) > len(deepseek_preview):
+        if any(len(answer) > len(preview) for answer, preview in zip(answers, previews)):
             ws[f'A{row}'] = "Answer (Full)"
-            ws[f'B{row}'] = chatgpt_answer
-            ws[f'B{row}'].alignment = Alignment(wrap_text=True, vertical="top")
-            ws[f'C{row}'] = deepseek_answer
-            ws[f'C{row}'].alignment = Alignment(wrap_text=True, vertical="top")
+            for col, answer in zip(columns, answers):
+                ws[f'{col}{row}'] = answer
+                ws[f'{col}{row}'].alignment = Alignment(wrap_text=True, vertical="top")
             row += 1
         
         # Expected outputs with per-keyword status (like sample group)
         expected_keywords = r.get("expected_keywords", [])
-        chatgpt_per_keyword = r.get("chatgpt_per_keyword", [])
-        deepseek_per_keyword = r.get("deepseek_per_keyword", [])
+        per_keyword = [r.get(f"{key}_per_keyword", []) for key, _ in providers]
         
         if expected_keywords:
             ws[f'A{row}'] = "Expected Outputs (Per-Keyword Status)"
             ws[f'A{row}'].font = header_font
             ws[f'A{row}'].fill = header_fill
-            ws[f'B{row}'] = "ChatGPT"
-            ws[f'B{row}'].font = header_font
-            ws[f'C{row}'] = "DeepSeek"
-            ws[f'C{row}'].font = header_font
+            for col, (_, label) in zip(columns, providers):
+                ws[f'{col}{row}'] = label
+                ws[f'{col}{row}'].font = header_font
             row += 1
             
             for i, keyword in enumerate(expected_keywords):
-                gpt_status = "True" if i < len(chatgpt_per_keyword) and chatgpt_per_keyword[i] else "False"
-                ds_status = "True" if i < len(deepseek_per_keyword) and deepseek_per_keyword[i] else "False"
                 ws[f'A{row}'] = f"[{keyword}]"
-                ws[f'B{row}'] = gpt_status
-                ws[f'C{row}'] = ds_status
+                for col, statuses in zip(columns, per_keyword):
+                    ws[f'{col}{row}'] = "True" if i < len(statuses) and statuses[i] else "False"
                 row += 1
         
         # Total correct count and percentage (like sample group)
-        chatgpt_matched = sum(1 for status in chatgpt_per_keyword if status) if chatgpt_per_keyword else 0
-        deepseek_matched = sum(1 for status in deepseek_per_keyword if status) if deepseek_per_keyword else 0
         total_keywords = len(expected_keywords) if expected_keywords else 0
         
         if total_keywords > 0:
-            chatgpt_pct = (chatgpt_matched / total_keywords * 100) if total_keywords > 0 else 0
-            deepseek_pct = (deepseek_matched / total_keywords * 100) if total_keywords > 0 else 0
             ws[f'A{row}'] = "Total Correct"
-            ws[f'B{row}'] = f"{chatgpt_matched} - {chatgpt_pct:.1f}%"
-            ws[f'C{row}'] = f"{deepseek_matched} - {deepseek_pct:.1f}%"
+            for col, statuses in zip(columns, per_keyword):
+                matched = sum(1 for status in statuses if status) if statuses else 0
+                ws[f'{col}{row}'] = f"{matched} - {matched / total_keywords * 100:.1f}%"
             row += 1
         
         ws[f'A{row}'] = "Result (Evaluation of Actual Output)"
         ws[f'A{row}'].font = header_font
         ws[f'A{row}'].fill = header_fill
-        ws[f'B{row}'] = "ChatGPT"
-        ws[f'B{row}'].font = header_font
-        ws[f'C{row}'] = "DeepSeek"
-        ws[f'C{row}'].font = header_font
+        for col, (_, label) in zip(columns, providers):
+            ws[f'{col}{row}'] = label
+            ws[f'{col}{row}'].font = header_font
         row += 1
         
         ws[f'A{row}'] = "Validity"
-        ws[f'B{row}'] = chatgpt_validity
-        ws[f'C{row}'] = deepseek_validity
+        for col, (key, _) in zip(columns, providers):
+            ws[f'{col}{row}'] = r.get(f"{key}_validity", "")
         row += 1
         
         # Validity reason (like sample group)
-        chatgpt_reason = r.get("chatgpt_validity_reason", "")
-        deepseek_reason = r.get("deepseek_validity_reason", "")
-        if chatgpt_reason or deepseek_reason:
+        reasons = [r.get(f"{key}_validity_reason", "") for key, _ in providers]
+        if any(reasons):
             ws[f'A{row}'] = "Reason"
-            ws[f'B{row}'] = chatgpt_reason
-            ws[f'B{row}'].alignment = Alignment(wrap_text=True, vertical="top")
-            ws[f'C{row}'] = deepseek_reason
-            ws[f'C{row}'].alignment = Alignment(wrap_text=True, vertical="top")
+            for col, reason in zip(columns, reasons):
+                ws[f'{col}{row}'] = reason
+                ws[f'{col}{row}'].alignment = Alignment(wrap_text=True, vertical="top")
             row += 1
         
         row += 2
         
         ws.column_dimensions['A'].width = 35
-        ws.column_dimensions['B'].width = 50
-        ws.column_dimensions['C'].width = 50
+        for col in columns:
+            ws.column_dimensions[col].width = 50
 
     try:
         wb.save(filename)
@@ -240,8 +238,10 @@ def save_results(name, results):
         raise Exception(f"Error saving Excel file '{filename}': {str(e)}")
 
 
-def save_summary(airline_results, visa_results):
-    """Create a summary Excel file with pass rates for both test sets"""
+def save_summary(airline_results, visa_results, providers=None):
+    """Create a summary Excel file with pass rates for both test sets, one row per provider"""
+    if providers is None:
+        providers = DEFAULT_PROVIDERS
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
     output_dir = os.path.join(project_root, "output")
     os.makedirs(output_dir, exist_ok=True)
@@ -261,20 +261,11 @@ def save_summary(airline_results, visa_results):
     bold_font = Font(bold=True)
     
     # Calculate pass rates
-    def calculate_pass_rate(results):
+    def calculate_pass_rate(results, key):
         total = len(results)
-        chatgpt_passed = sum(1 for r in results if r.get("chatgpt_validity") == "Valid")
-        deepseek_passed = sum(1 for r in results if r.get("deepseek_validity") == "Valid")
-        return total, chatgpt_passed, deepseek_passed
-    
-    airline_total, airline_gpt_passed, airline_ds_passed = calculate_pass_rate(airline_results)
-    visa_total, visa_gpt_passed, visa_ds_passed = calculate_pass_rate(visa_results)
-    
-    # Calculate percentages
-    airline_gpt_pct = (airline_gpt_passed / airline_total * 100) if airline_total > 0 else 0
-    airline_ds_pct = (airline_ds_passed / airline_total * 100) if airline_total > 0 else 0
-    visa_gpt_pct = (visa_gpt_passed / visa_total * 100) if visa_total > 0 else 0
-    visa_ds_pct = (visa_ds_passed / visa_total * 100) if visa_total > 0 else 0
+        passed = sum(1 for r in results if r.get(f"{key}_validity") == "Valid")
+        pct = (passed / total * 100) if total > 0 else 0
+        return total, passed, pct
     
     # Header row 1
     ws.merge_cells('A1:B1')
@@ -317,51 +308,25 @@ def save_summary(airline_results, visa_results):
     ws['F2'].fill = header_fill
     ws['F2'].alignment = center_align
     
-    # ChatGPT row
-    ws['A3'] = "ChatGPT"
-    ws['A3'].font = bold_font
-    ws['A3'].fill = data_fill_odd
-    ws['B3'] = ""
-    ws['B3'].fill = data_fill_odd
-    
-    ws['C3'] = f"{airline_gpt_passed}/{airline_total}"
-    ws['C3'].alignment = center_align
-    ws['C3'].fill = data_fill_odd
-    
-    ws['D3'] = f"{airline_gpt_pct:.0f}%"
-    ws['D3'].alignment = center_align
-    ws['D3'].fill = data_fill_odd
-    
-    ws['E3'] = f"{visa_gpt_passed}/{visa_total}"
-    ws['E3'].alignment = center_align
-    ws['E3'].fill = data_fill_odd
-    
-    ws['F3'] = f"{visa_gpt_pct:.0f}%"
-    ws['F3'].alignment = center_align
-    ws['F3'].fill = data_fill_odd
-    
-    # DeepSeek row
-    ws['A4'] = "Deepseek"
-    ws['A4'].font = bold_font
-    ws['A4'].fill = data_fill_even
-    ws['B4'] = ""
-    ws['B4'].fill = data_fill_even
-    
-    ws['C4'] = f"{airline_ds_passed}/{airline_total}"
-    ws['C4'].alignment = center_align
-    ws['C4'].fill = data_fill_even
-    
-    ws['D4'] = f"{airline_ds_pct:.0f}%"
-    ws['D4'].alignment = center_align
-    ws['D4'].fill = data_fill_even
-    
-    ws['E4'] = f"{visa_ds_passed}/{visa_total}"
-    ws['E4'].alignment = center_align
-    ws['E4'].fill = data_fill_even
-    
-    ws['F4'] = f"{visa_ds_pct:.0f}%"
-    ws['F4'].alignment = center_align
-    ws['F4'].fill = data_fill_even
+    # One row per provider
+    row = 3
+    for i, (key, label) in enumerate(providers):
+        data_fill = data_fill_odd if i % 2 == 0 else data_fill_even
+        airline_total, airline_passed, airline_pct = calculate_pass_rate(airline_results, key)
+        visa_total, visa_passed, visa_pct = calculate_pass_rate(visa_results, key)
+        
+        ws[f'A{row}'] = SUMMARY_LABELS.get(label, label)
+        ws[f'A{row}'].font = bold_font
+        ws[f'A{row}'].fill = data_fill
+        ws[f'B{row}'] = ""
+        ws[f'B{row}'].fill = data_fill
+        
+        for col, value in (('C', f"{airline_passed}/{airline_total}"), ('D', f"{airline_pct:.0f}%"),
+                           ('E', f"{visa_passed}/{visa_total}"), ('F', f"{visa_pct:.0f}%")):
+            ws[f'{col}{row}'] = value
+            ws[f'{col}{row}'].alignment = center_align
+            ws[f'{col}{row}'].fill = data_fill
+        row += 1
     
     # Set column widths
     ws.column_dimensions['A'].width = 15
@@ -372,8 +337,9 @@ def save_summary(airline_results, visa_results):
     ws.column_dimensions['F'].width = 15
     
     # Add caption
-    ws['A6'] = "Table 1. Test Case Summary of Passing Results"
-    ws['A6'].font = Font(italic=True)
+    caption_row = row + 1
+    ws[f'A{caption_row}'] = "Table 1. Test Case Summary of Passing Results"
+    ws[f'A{caption_row}'].font = Font(italic=True)
     
     try:
         wb.save(filename)
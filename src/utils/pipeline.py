@@ -0,0 +1,183 @@
+import sys
+sys.dont_write_bytecode = True
+import queue
+import threading
+import time
+
+# Poll interval for blocked puts/gets, so stop() is noticed promptly
+_POLL = 0.1
+
+
+class Stage:
+    """
+    One step of a Pipeline: fn(item) -> item for the next stage.
+
+    `workers` threads run fn; `queue_size` bounds the queue feeding this
+    stage, so a slow stage makes the ones before it wait (backpressure)
+    instead of piling up work.
+    """
+
+    def __init__(self, name, fn, workers=1, queue_size=None):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+_DONE = object()
+
+
+class Pipeline:
+    """
+    Threads connected by bounded queues; every stage works concurrently.
+
+    Items flow through the stages in order, but each stage picks up the
+    next item as soon as it is free, so network-bound and CPU-bound stages
+    overlap. run() yields results in completion order.
+
+    An exception raised by a stage is re-raised from run(), unless its type
+    is in `drop`: those items are silently discarded (e.g. work refused
+    because the run's deadline passed).
+    """
+
+    def __init__(self, stages, queue_size=16, drop=()):
+        self.stages = list(stages)
+        self.drop = tuple(drop)
+        self._queues = [
+            queue.Queue(maxsize=stage.queue_size or queue_size) for stage in self.stages
+        ] + [queue.Queue()]
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._live = [stage.workers for stage in self.stages]
+        self._stats = {
+            stage.name: {"workers": stage.workers, "processed": 0, "dropped": 0, "busy_time": 0.0,
+                         "max_queue_depth": 0}
+            for stage in self.stages
+        }
+
+    def _put(self, index, item):
+        """Put into queue `index`, waiting while it is full; False if the pipeline stopped first."""
+        target = self._queues[index]
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL)
+            except queue.Full:
+                continue
+            if index < len(self.stages) and item is not _DONE:
+                stats = self._stats[self.stages[index].name]
+                with self._lock:
+                    stats["max_queue_depth"] = max(stats["max_queue_depth"], target.qsize())
+            return True
+        return False
+
+    def _feed(self, items):
+        try:
+            for item in items:
+                if not self._put(0, item):
+                    return
+        finally:
+            for _ in range(self.stages[0].workers):
+                self._put(0, _DONE)
+
+    def _work(self, index):
+        stage = self.stages[index]
+        stats = self._stats[stage.name]
+        source = self._queues[index]
+        while True:
+            if self._stop.is_set():
+                return
+            try:
+                item = source.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                self._put(index + 1, item)
+                continue
+            started = time.perf_counter()
+            try:
+                result = stage.fn(item)
+            except self.drop:
+                with self._lock:
+                    stats["dropped"] += 1
+                continue
+            except Exception as e:
+                result = _Failure(e)
+            finally:
+                with self._lock:
+                    stats["busy_time"] += time.perf_counter() - started
+            with self._lock:
+                stats["processed"] += 1
+            self._put(index + 1, result)
+
+        # The last worker of a stage to finish tells the next stage there is no more work
+        with self._lock:
+            self._live[index] -= 1
+            last = self._live[index] == 0
+        if last:
+            following = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+            for _ in range(following):
+                self._put(index + 1, _DONE)
+
+    def run(self, items, timeout=None):
+        """
+        Push `items` through every stage and yield the results as they finish.
+
+        Args:
+            items: Iterable of inputs for the first stage
+            timeout: Seconds to wait in total (None = no limit); when it runs
+                out the pipeline is stopped and the generator ends early
+
+        Raises:
+            Exception: The first exception a stage raised that is not in `drop`
+        """
+        threads = [threading.Thread(target=self._feed, args=(items,), name="pipeline-feed", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(target=self._work, args=(index,), name=f"pipeline-{stage.name}-{n}", daemon=True)
+                for n in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+
+        ends = time.monotonic() + timeout if timeout is not None else None
+        output = self._queues[-1]
+        try:
+            while True:
+                wait = None if ends is None else ends - time.monotonic()
+                if wait is not None and wait <= 0:
+                    return
+                try:
+                    item = output.get(timeout=wait)
+                except queue.Empty:
+                    return
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            # Workers still waiting on a socket are daemons; they drop their item when it returns
+            self.stop()
+
+    def stop(self):
+        """Stop feeding and processing; items still in the queues are discarded."""
+        self._stop.set()
+
+    def stats(self):
+        """
+        Per-stage counters: workers, processed and dropped items, busy_time
+        (seconds spent in fn, summed over workers), and queue_depth / max_queue_depth
+        (items waiting for the stage now / at most).
+        """
+        with self._lock:
+            stats = {name: dict(values) for name, values in self._stats.items()}
+        for stage, stage_queue in zip(self.stages, self._queues):
+            stats[stage.name]["queue_depth"] = stage_queue.qsize()
+        return stats
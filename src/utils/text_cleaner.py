@@ -2,45 +2,263 @@ import sys
 sys.dont_write_bytecode = True
 import re
 
+# Rules in the order they apply; each runs only if its trigger text occurs,
+# so plain prose skips nearly all of them
+_BOLD_STARS = re.compile(r'\*\*([^*]+)\*\*')
+_BOLD_UNDERSCORES = re.compile(r'__([^_]+)__')
+_ITALIC_STAR = re.compile(r'\*([^*\n]+)\*')
+_ITALIC_UNDERSCORE = re.compile(r'_([^_\n]+)_')
+_SPACED_STAR = re.compile(r'\s+\*\s+')
+_STAR_BEFORE_SPACE = re.compile(r'\*\s+')
+_STAR_AFTER_SPACE = re.compile(r'\s+\*')
+_HEADER = re.compile(r'^#+\s+', re.MULTILINE)
+_BULLET = re.compile(r'^[\s]*[-*•]\s+', re.MULTILINE)
+_NUMBERED = re.compile(r'^\d+\.\s+', re.MULTILINE)
+_CODE_BLOCK = re.compile(r'```[\s\S]*?```')
+_INLINE_CODE = re.compile(r'`([^`]+)`')
+# Prefixes are only removed at the very start, so each is a single match() there;
+# the length is that of the literal phrase, before the [,\s:]+ run
+_PREFIXES = (
+    (re.compile(r'Based on the provided inputs and contexts[,\s:]+', re.IGNORECASE), 41),
+    (re.compile(r'Here is[,\s:]+', re.IGNORECASE), 7),
+    (re.compile(r'According to[,\s:]+', re.IGNORECASE), 12),
+)
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+_SPACES = re.compile(r'[ \t]+')
+
+# The quote clean-up has always replaced this literal text (not single quotes)
+_QUOTE_ARTIFACT = ', "\'").replace('
+
+# Whitespace run holding a line break, and the cleaned text up to the last
+# point between two non-space characters
+_LINE_BREAK = re.compile(r'[^\S\n]*\n\s*')
+_SETTLED = re.compile(r'.*\S(?=\S)', re.DOTALL)
+# Characters whose removal, next to a line break, can join it to a rule match
+_MARKERS = frozenset('*_#-•')
+# Characters that can close a bold run, code block or inline code span
+_CLOSERS = '*_`'
+
+
+def _open_after(pattern, text, opener):
+    """True if `opener` occurs after the last match of pattern, i.e. a match may still close later."""
+    end = 0
+    for match in pattern.finditer(text):
+        end = match.end()
+    return opener in text[end:]
+
+
+def _clean_markup(text, settled=False):
+    """
+    Markdown rules of clean_text(), in order.
+
+    With settled=True, return None if a bold run, code block or inline
+    code span is still open at the end of text.
+    """
+    # Remove markdown bold/italic (**, __, *, _) and standalone asterisks
+    if '*' in text:
+        if settled and _open_after(_BOLD_STARS, text, '**'):
+            return None
+        text = _BOLD_STARS.sub(r'\1', text)
+    if '_' in text:
+        if settled and _open_after(_BOLD_UNDERSCORES, text, '__'):
+            return None
+        text = _BOLD_UNDERSCORES.sub(r'\1', text)
+    if '*' in text:
+        text = _ITALIC_STAR.sub(r'\1', text)
+    if '_' in text:
+        text = _ITALIC_UNDERSCORE.sub(r'\1', text)
+    if '*' in text:
+        text = _SPACED_STAR.sub(' ', text)
+        text = _STAR_BEFORE_SPACE.sub('', text)
+        text = _STAR_AFTER_SPACE.sub('', text)
+
+    # Remove markdown headers (#) and lists (-, *, •, 1.)
+    if '#' in text:
+        text = _HEADER.sub('', text)
+    if '-' in text or '*' in text or '•' in text:
+        text = _BULLET.sub('', text)
+    if '.' in text:
+        text = _NUMBERED.sub('', text)
+
+    # Remove markdown code blocks and inline code
+    if '`' in text:
+        if settled and _open_after(_CODE_BLOCK, text, '```'):
+            return None
+        text = _CODE_BLOCK.sub('', text)
+        if settled and _open_after(_INLINE_CODE, text, '`'):
+            return None
+        text = _INLINE_CODE.sub(r'\1', text)
+    return text
+
+
+def _strip_prefixes(text, final=True):
+    """
+    Remove common prefixes that LLMs add at the start of text.
+
+    With final=False, text is only the start of the answer: return None
+    while more of it could change the outcome.
+    """
+    for prefix, length in _PREFIXES:
+        if not final and len(text) <= length:
+            return None
+        match = prefix.match(text)
+        if match:
+            if not final and match.end() == len(text):
+                return None
+            text = text[match.end():]
+    return text
+
+
+def _collapse_whitespace(text):
+    if '\n' in text:
+        text = _BLANK_LINES.sub('\n\n', text)
+    if '\t' in text or '  ' in text:
+        text = _SPACES.sub(' ', text)
+    return text
+
+
 def clean_text(text):
     """Remove markdown formatting, asterisks, and other formatting from text."""
     if not text or not isinstance(text, str):
         return ""
-    
-    # Remove markdown bold/italic (**, __, *)
-    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-    text = re.sub(r'__([^_]+)__', r'\1', text)
-    text = re.sub(r'\*([^*\n]+)\*', r'\1', text)
-    text = re.sub(r'_([^_\n]+)_', r'\1', text)
-    
-    # Remove standalone asterisks (but not in middle of words)
-    text = re.sub(r'\s+\*\s+', ' ', text)
-    text = re.sub(r'\*\s+', '', text)
-    text = re.sub(r'\s+\*', '', text)
-    
-    # Remove markdown headers (#)
-    text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
-    
-    # Remove markdown lists (-, *, 1.)
-    text = re.sub(r'^[\s]*[-*•]\s+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^\d+\.\s+', '', text, flags=re.MULTILINE)
-    
-    # Remove markdown code blocks
-    text = re.sub(r'```[\s\S]*?```', '', text)
-    text = re.sub(r'`([^`]+)`', r'\1', text)
-    
-    # Remove common prefixes that LLMs add
-    text = re.sub(r'^Based on the provided inputs and contexts[,\s:]+', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'^Here is[,\s:]+', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'^According to[,\s:]+', '', text, flags=re.IGNORECASE)
-    
-    # Remove extra whitespace
-    text = re.sub(r'\n\s*\n+', '\n\n', text)
-    text = re.sub(r'[ \t]+', ' ', text)
-    
-    # Clean up quotes
-    text = text.replace('"', '"').replace('"', '"')
-    text = text.replace(''', "'").replace(''', "'")
-    
+
+    text = _collapse_whitespace(_strip_prefixes(_clean_markup(text)))
+    if _QUOTE_ARTIFACT in text:
+        text = text.replace(_QUOTE_ARTIFACT, "'")
     return text.strip()
 
+
+class IncrementalCleaner:
+    """
+    clean_text() for text that arrives in chunks, e.g. a streamed answer.
+
+    feed() each chunk and it returns the cleaned text that can no longer
+    change; finish() returns the rest. Joined, they equal clean_text() of
+    the whole text. Only the text since the last settled line break is
+    held back, so cleaning keeps pace with generation instead of running
+    after it.
+
+    While a bold run, code block or inline code span is open, everything
+    from its start is held back, since its closing marker would change how
+    all of it is cleaned. The held text is only scanned again when a new
+    line arrives together with a *, _ or ` that might close it, so the work
+    stays linear in the answer length unless those markers keep arriving
+    inside the open construct (e.g. a long code block full of snake_case
+    names): then each such line re-scans the held text, and the worst case
+    is quadratic in the length of the construct.
+
+    Args:
+        strip_input: Clean the text with surrounding whitespace stripped,
+            as clean_text(text.strip())
+    """
+
+    def __init__(self, strip_input=False):
+        self.strip_input = strip_input
+        self._raw = ""          # Not yet through the markdown rules
+        self._head = ""         # Start of the answer, until the prefix rules are decided (then None)
+        self._spaced = ""       # Waiting for the whitespace rules
+        self._quoted = ""       # Waiting for the quote clean-up
+        self._trailing = ""     # Whitespace that is only kept if more text follows
+        self._started = False   # Set once anything but whitespace has been returned
+        self._open = False      # The held text ends inside a bold run or code block
+        self._closable = False  # A marker that might close it has arrived since
+
+    def feed(self, chunk):
+        """Add a chunk of text; return the newly cleaned text (possibly "")."""
+        if not chunk:
+            return ""
+        if self.strip_input and not self._raw:
+            chunk = chunk.lstrip()
+        at_space = self._raw[-1:].isspace()
+        self._raw += chunk
+        self._closable = self._closable or any(marker in chunk for marker in _CLOSERS)
+
+        # Without a new line break (or a follower for one at the end) the
+        # cut cannot move, and without a new marker an open construct
+        # cannot close, so the held text is not scanned again
+        if '\n' not in chunk and not at_space:
+            return ""
+        if self._open and not self._closable:
+            return ""
+
+        cut = self._find_cut()
+        if cut is None:
+            return ""
+        markup = _clean_markup(self._raw[:cut], settled=True)
+        if markup is None:
+            self._open = True
+            self._closable = any(marker in self._raw[cut:] for marker in _CLOSERS)
+            return ""
+        self._open = False
+        self._raw = self._raw[cut:]
+        return self._settle(markup, final=False)
+
+    def finish(self):
+        """Clean whatever is still held back; the cleaner is spent afterwards."""
+        raw, self._raw = self._raw, ""
+        if self.strip_input:
+            raw = raw.rstrip()
+        return self._settle(_clean_markup(raw) if raw else "", final=True)
+
+    def _find_cut(self):
+        # Latest point just after the first line break of a whitespace run
+        # where both neighbours are plain text; the markdown rules then
+        # treat the text on either side independently
+        raw = self._raw
+        breaks = list(_LINE_BREAK.finditer(raw))
+        for match in reversed(breaks):
+            start, end = match.span()
+            if start == 0 or end == len(raw):
+                continue
+            before, after = raw[start - 1], raw[end]
+            if before in _MARKERS or after in '*_':
+                continue
+            # "1." alone on a line is a list marker, "it." is not
+            if before == '.' and not (start >= 2 and raw[start - 2].isalpha()):
+                continue
+            return raw.index('\n', start) + 1
+        return None
+
+    def _settle(self, text, final):
+        if self._head is not None:
+            self._head += text
+            text = _strip_prefixes(self._head, final)
+            if text is None:
+                return ""
+            self._head = None
+
+        self._spaced += text
+        if final:
+            ready, self._spaced = self._spaced, ""
+        else:
+            match = _SETTLED.match(self._spaced)
+            if not match:
+                return ""
+            ready, self._spaced = self._spaced[:match.end()], self._spaced[match.end():]
+        self._quoted += _collapse_whitespace(ready)
+
+        # An artifact can only be replaced once all of it has arrived
+        quoted = self._quoted
+        limit = len(quoted) if final else len(quoted) - (len(_QUOTE_ARTIFACT) - 1)
+        parts = []
+        start = 0
+        while True:
+            found = quoted.find(_QUOTE_ARTIFACT, start)
+            if found == -1 or found >= limit:
+                break
+            parts.append(quoted[start:found])
+            parts.append("'")
+            start = found + len(_QUOTE_ARTIFACT)
+        end = max(start, limit)
+        parts.append(quoted[start:end])
+        self._quoted = quoted[end:]
+
+        text = self._trailing + "".join(parts)
+        body = text.rstrip()
+        self._trailing = "" if final else text[len(body):]
+        if not self._started:
+            body = body.lstrip()
+            if not body:
+                self._trailing = ""
+        self._started = self._started or bool(body)
+        return body